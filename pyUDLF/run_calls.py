@@ -1,13 +1,20 @@
 import os
+import asyncio
+import codecs
+import time
 import requests
 import tarfile
-import tempfile
 import logging
 from pathlib import Path
+import copy
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pyUDLF.utils import readData, outputType, evaluation, parser
+from pyUDLF.utils import configGenerator, compression, classIndex, resultCache, scratch
+from pyUDLF.utils import fifoStream
 import sys
 import zipfile
+import numpy as np
 
 # ---------- Logger configuration ----------
 logger = logging.getLogger(__name__)
@@ -200,13 +207,17 @@ def verify_bin(config_path: str, bin_path: str) -> None:
     logger.debug(f"Extraction complete, checking for binary at {bin_path}")
 
 
-def run_platform(config_file: str, bin_path: str):
+def run_platform(config_file: str, bin_path: str, timeout: float = None,
+                 work_dir: str = None):
     """
     Run the UDLF binary with the given config file and verify execution.
 
     Args:
         config_file (str): Path to the configuration file.
         bin_path (str): Path to the UDLF binary.
+        timeout (float, optional): Seconds before the binary is killed. Default is no limit.
+        work_dir (str, optional): Scratch directory of the run, where the log is
+            written. Default is the scratch root.
 
     Returns:
         tuple:
@@ -218,10 +229,8 @@ def run_platform(config_file: str, bin_path: str):
     # Ensure binary and config exist (download/extract if missing)
     verify_bin(config_file, bin_path)
 
-    # Create a unique temporary log file
-    tmp_log = tempfile.NamedTemporaryFile(suffix="_udlf_log.txt", delete=False)
-    path_log_out = tmp_log.name
-    tmp_log.close()
+    # Create a unique temporary log file (in RAM-backed scratch space when available)
+    path_log_out = scratch.mkstemp(suffix="_udlf_log.txt", dir=work_dir)
 
     # Build command
     cmd = [bin_path, config_file]
@@ -234,10 +243,11 @@ def run_platform(config_file: str, bin_path: str):
 
     try:
         with open(path_log_out, "w") as log_file:
-            subprocess.run(cmd, stdout=log_file, stderr=subprocess.STDOUT, check=False)
+            subprocess.run(cmd, stdout=log_file, stderr=subprocess.STDOUT, check=False,
+                           timeout=timeout)
     except Exception as e:
         logger.error(f"Failed to run UDLF binary: {e}")
-        return False, path_log_out
+        return True, path_log_out
 
     # Verify run completed successfully
     run_ok = verify_running(path_log_out)
@@ -249,6 +259,43 @@ def run_platform(config_file: str, bin_path: str):
     return run_ok, path_log_out
 
 
+ERROR_KEYWORDS = [
+    "invalid",
+    "error",
+    "can't",
+    "failed",
+    "failure",
+    "exception",
+    "traceback",
+    "not found",
+    "critical"
+]
+
+
+def check_log_line(line: str) -> bool:
+    """
+    Check one log line for error keywords or warning messages.
+
+    Args:
+        line (str): Log line.
+
+    Returns:
+        bool: True if the line reports an error (excluding "warning"), False otherwise.
+    """
+    lowercase_line = line.lower()
+
+    # Check for errors (logged once even if multiple keywords match)
+    error_flag = any(keyword in lowercase_line for keyword in ERROR_KEYWORDS)
+    if error_flag:
+        logger.error(f"[LOG ERROR] {line.strip()}")
+
+    # Check for warnings
+    if "warning" in lowercase_line:
+        logger.warning(f"[LOG WARNING] {line.strip()}")
+
+    return error_flag
+
+
 def verify_running(path: str) -> bool:
     """
     Check a log file for error keywords or warning messages.
@@ -260,42 +307,21 @@ def verify_running(path: str) -> bool:
         bool: True if any error (excluding "warning") is found, False otherwise.
     """
     error_flag = False
-    error_keywords = [
-        "invalid",
-        "error",
-        "can't",
-        "failed",
-        "failure",
-        "exception",
-        "traceback",
-        "not found",
-        "critical"
-    ]
-
     try:
         with open(path, "r", encoding="utf-8") as file:
             for line in file:
-                lowercase_line = line.lower()
-                
-                # Check for errors
-                for keyword in error_keywords:
-                    if keyword in lowercase_line:
-                        logger.error(f"[LOG ERROR] {line.strip()}")
-                        error_flag = True
-                        break  # avoid duplicate logging if multiple keywords match
-                
-                # Check for warnings
-                if "warning" in lowercase_line:
-                    logger.warning(f"[LOG WARNING] {line.strip()}")
+                if check_log_line(line):
+                    error_flag = True
     except FileNotFoundError:
         logger.error(f"Log file not found: {path}")
-        return True#True  # treat as error
+        return True  # treat as error
     except Exception as e:
         logger.error(f"Unexpected error while verifying log file {path}: {e}")
         return True  # treat as error
 
     return error_flag
 
+
 def individual_gain_config_running(config_file: str, depth: int = -1):
     """
     Compute individual gain using parameters defined in a UDLF config file.
@@ -343,29 +369,32 @@ def individual_gain_config_running(config_file: str, depth: int = -1):
     if depth == -1:
         logger.warning("Depth not set, using dataset size instead.")
         try:
-            with open(params["list_path"], "r") as f:
-                depth = len([line.strip() for line in f])
+            depth = len(classIndex.get_class_index(
+                params["list_path"], params["classes_path"]))
         except Exception as e:
             logger.error(f"Failed to read list file {params['list_path']} to determine depth: {e}")
             return None
 
     # --- Read data ---
     try:
-        classes_list = readData.read_classes(params["list_path"], params["classes_path"])
-        rks_before = readData.read_ranked_lists_file_numeric(params["before_path"], top_k=depth)
-        rks_after = readData.read_ranked_lists_file_numeric(params["after_path"], top_k=depth)
+        classes_list = classIndex.get_class_index(
+            params["list_path"], params["classes_path"])
+        rks_after = readData.read_ranked_lists_numpy(
+            params["after_path"], top_k=depth, dataset_size=len(classes_list))
     except Exception as e:
         logger.error(f"Failed to read input/output ranked lists: {e}")
         return None
 
-    if len(rks_before) < depth:
+    if len(rks_after) < depth:
         logger.warning("Depth larger than ranked list size. Adjusting depth to max size.")
-        depth = len(rks_before)
+        depth = len(rks_after)
 
     # --- Compute gain ---
+    # the input side is memoized by file, so it is only evaluated once per sweep
     try:
         individual_gain_list = evaluation.compute_gain(
-            rks_before, rks_after, classes_list, depth, measure="MAP", verbose=True)
+            None, rks_after, classes_list, depth, measure="MAP", verbose=True,
+            before_path=params["before_path"])
         logger.info("Individual gain computation completed successfully.")
         return individual_gain_list
     except Exception as e:
@@ -430,30 +459,137 @@ def prepare_visualization(params: dict, output: "OutputType") -> bool:
     logger.info("Visualization paths set successfully.")
     return True
 
+def stage_compressed_inputs(config_file: str):
+    """
+    Decompress compressed input files referenced by a config into a scratch
+    directory, since the UDLF binary only reads plain files.
+
+    Args:
+        config_file (str): Path to the configuration file.
+
+    Returns:
+        tuple:
+            str: Config to run (the original one if nothing was staged).
+            ScratchDir or None: Scratch directory to clean up after the run.
+    """
+    parameters, list_parameters = readData.read_config(config_file)
+    input_params = [param for param in list_parameters
+                    if param in ("INPUT_FILE", "INPUT_FILE_LIST", "INPUT_FILE_CLASSES")
+                    or param.startswith("INPUT_FILES_FUSION_")]
+
+    stage_dir = None
+    for param in input_params:
+        value = parameters[param][0].strip()
+        if not os.path.isfile(value) or not compression.is_compressed(value):
+            continue
+        if stage_dir is None:
+            # rough estimate of the decompressed size, for the memory budget
+            stage_dir = scratch.ScratchDir(prefix="pyudlf_stage_",
+                                           expected_bytes=4 * os.path.getsize(value))
+        param_dir = stage_dir.join(param.lower())
+        os.makedirs(param_dir)
+        configGenerator.setParameter(
+            param, compression.stage_plain(value, param_dir), parameters)
+
+    if stage_dir is None:
+        return config_file, None
+
+    staged_config = stage_dir.join("config.ini")
+    configGenerator.writeConfig(parameters, list_parameters, staged_config)
+    logger.debug(f"Compressed inputs staged in: {stage_dir.path}")
+    return staged_config, stage_dir
+
+
 def runWithConfig(
     config_file: str = None,
     get_output: bool = False,
     compute_individual_gain: bool = False,
     depth: int = -1,
-    visualization: bool = False
+    visualization: bool = False,
+    use_cache: bool = False,
+    work_dir: str = None
 ):
     """
     Run UDLF framework with an existing configuration file.
+
+    The binary's log is written to work_dir (the caller's scratch directory)
+    when given, to the scratch root otherwise.
+
+    With use_cache, a run identical to a cached one (same parameters apart
+    from output paths, same binary, same input files) is not executed: its
+    outputs are restored from the result cache (see resultCache).
     """
     global bin_path
-    output = outputType.OutputType()
 
     # Step 1: validate config and binary
     if not validate_config_and_binary(config_file, bin_path):
         return False
 
-    # Step 2: run platform
-    run_ok, log_out_path = run_platform(config_file, bin_path)
+    cache_key = None
+    if use_cache:
+        try:
+            cache_key = resultCache.get_key(config_file, bin_path)
+            log_dict = resultCache.lookup(cache_key, config_file)
+        except Exception as e:
+            logger.warning(f"Result cache unavailable for {config_file}: {e}")
+            cache_key, log_dict = None, None
+        if log_dict is not None:
+            return build_output(config_file, log_dict, get_output,
+                                compute_individual_gain, depth, visualization)
+
+    # Step 2: run platform (compressed inputs are staged as plain files)
+    try:
+        run_config, stage_dir = stage_compressed_inputs(config_file)
+    except Exception as e:
+        logger.error(f"Failed to stage compressed inputs of {config_file}: {e}")
+        return False
+    try:
+        run_ok, log_out_path = run_platform(run_config, bin_path, work_dir=work_dir)
+    finally:
+        if stage_dir is not None:
+            stage_dir.cleanup()
     if run_ok:
         logger.error("UDLF execution failed.")
+        if os.path.exists(log_out_path):
+            os.remove(log_out_path)
         return False
     logger.info("pyUDLF execution complete!")
 
+    log_dict = None
+    if get_output or cache_key is not None:
+        log_dict = parser.parse_log_and_cleanup(log_out_path)
+    elif os.path.exists(log_out_path):
+        os.remove(log_out_path)
+    if cache_key is not None:
+        resultCache.store(cache_key, config_file, log_dict)
+    return build_output(config_file, log_dict, get_output,
+                        compute_individual_gain, depth, visualization)
+
+
+def build_output(
+    config_file: str,
+    log_dict: dict,
+    get_output: bool = False,
+    compute_individual_gain: bool = False,
+    depth: int = -1,
+    visualization: bool = False
+):
+    """
+    Build the OutputType of a finished run (steps 3 to 5 of runWithConfig).
+
+    Args:
+        config_file (str): Path to the configuration file that was run.
+        log_dict (dict): Parsed log of the run.
+        get_output (bool, optional): If True, parse and return output paths.
+        compute_individual_gain (bool, optional): If True, compute individual gain list.
+        depth (int, optional): Depth for gain computation. Default is -1.
+        visualization (bool, optional): If True, prepare visualization info.
+
+    Returns:
+        OutputType or False: OutputType object with parsed results, or False if parsing failed.
+    """
+    output = outputType.OutputType()
+
     # Step 3: parse config + log if requested
     params = {}
     if get_output:
@@ -462,7 +598,8 @@ def runWithConfig(
             output.rk_path = params["rk_path"]
             output.matrix_path = params["matrix_path"]
             output.log_path = params["log_path"]
-            output.log_dict = parser.parse_log_and_cleanup(log_out_path)
+            output.list_path = params["list_path"]
+            output.log_dict = log_dict
         except Exception as e:
             logger.error(f"Error parsing config file {config_file}: {e}")
             return False
@@ -491,7 +628,8 @@ def run(
     get_output: bool = False,
     compute_individual_gain: bool = False,
     depth: int = -1,
-    visualization: bool = False
+    visualization: bool = False,
+    use_cache: bool = False
 ):
     """
     Run UDLF with a generated configuration file.
@@ -502,6 +640,7 @@ def run(
         compute_individual_gain (bool, optional): If True, compute individual gain list.
         depth (int, optional): Depth for gain computation. Default is -1.
         visualization (bool, optional): If True, prepare visualization info.
+        use_cache (bool, optional): If True, reuse the results of an identical cached run.
 
     Returns:
         OutputType or False: OutputType object with parsed results, or False if execution failed.
@@ -512,10 +651,9 @@ def run(
 
     global bin_path
 
-    # Create a unique temporary config file
-    tmp_file = tempfile.NamedTemporaryFile(suffix=".ini", delete=False)
-    input_path = tmp_file.name
-    tmp_file.close()  # close so input_type can write into it
+    # Per-run scratch directory for the temporary config
+    run_dir = scratch.ScratchDir(prefix="pyudlf_run_")
+    input_path = run_dir.join("config.ini")
 
     try:
         # Write config and run
@@ -527,7 +665,9 @@ def run(
             get_output=get_output,
             compute_individual_gain=compute_individual_gain,
             depth=depth,
-            visualization=visualization
+            visualization=visualization,
+            use_cache=use_cache,
+            work_dir=run_dir.path
         )
 
         return output
@@ -538,7 +678,401 @@ def run(
 
     finally:
         # Always clean up temp config
-        if os.path.exists(input_path):
-            os.remove(input_path)
-            logger.debug(f"Temporary config removed: {input_path}")
+        run_dir.cleanup()
+        logger.debug(f"Temporary config removed: {input_path}")
+
+
+
+# parameters with the paths written by the binary
+OUTPUT_PATH_PARAMS = ("OUTPUT_FILE_PATH", "OUTPUT_LOG_FILE_PATH")
+
+
+def prepare_jobs(inputs, job_dirs):
+    """
+    Write the config of each job into its own directory. Jobs that would
+    write to the same output path get a "_<job index>" suffix on that path,
+    so concurrent runs never overwrite each other's outputs.
+
+    Args:
+        inputs (list): InputType objects or config file paths.
+        job_dirs (list): One scratch directory per job.
+
+    Returns:
+        list: Config file to run for each job (None if it could not be written).
+    """
+    configs = []
+    outputs = []
+    for i, (input_item, job_dir) in enumerate(zip(inputs, job_dirs)):
+        try:
+            if isinstance(input_item, str):
+                config = input_item
+            else:
+                config = os.path.join(job_dir, "config.ini")
+                input_item.write_config(config)
+            config_model = readData.load_config(config)
+        except Exception as e:
+            logger.error(f"Job {i}: failed to write or read its config: {e}")
+            configs.append(None)
+            outputs.append({})
+            continue
+        configs.append(config)
+        outputs.append({param: config_model.get(param) for param in OUTPUT_PATH_PARAMS})
+
+    counts = {}
+    for job_outputs in outputs:
+        for param, value in job_outputs.items():
+            if value:
+                counts[(param, value)] = counts.get((param, value), 0) + 1
+
+    for i, (config, job_outputs) in enumerate(zip(configs, outputs)):
+        shared = [param for param, value in job_outputs.items()
+                  if value and counts[(param, value)] > 1]
+        if not shared:
+            continue
+        parameters, list_parameters = readData.read_config(config)
+        for param in shared:
+            root, ext = os.path.splitext(job_outputs[param])
+            new_value = f"{root}_{i}{ext}"
+            logger.warning(f"Job {i}: {param} shared with other jobs, using {new_value}")
+            configGenerator.setParameter(param, new_value, parameters)
+        configs[i] = os.path.join(job_dirs[i], "config.ini")
+        configGenerator.writeConfig(parameters, list_parameters, configs[i])
+
+    return configs
+
+
+def run_many(
+    inputs,
+    max_workers: int = None,
+    get_output: bool = False,
+    compute_individual_gain: bool = False,
+    depth: int = -1,
+    use_cache: bool = False
+):
+    """
+    Run many configurations concurrently in a bounded pool.
+
+    Each job gets its own config in a private temporary directory, and the
+    UDLF processes run in parallel (at most max_workers at a time). A job
+    that fails does not affect the others.
+
+    Args:
+        inputs (list): InputType objects and/or config file paths.
+        max_workers (int, optional): Maximum concurrent runs. Default is the CPU count.
+        get_output (bool, optional): If True, parse and return output paths.
+        compute_individual_gain (bool, optional): If True, compute individual gain lists.
+        depth (int, optional): Depth for gain computation. Default is -1.
+        use_cache (bool, optional): If True, reuse the results of identical cached runs.
+
+    Returns:
+        list: One result per input, in submission order: OutputType, or False
+              if that job failed.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    inputs = list(inputs)
+    job_dirs = [scratch.ScratchDir(prefix="pyudlf_job_") for _ in inputs]
+
+    def run_job(index, config):
+        if config is None:
+            return False
+        try:
+            return runWithConfig(
+                config_file=config,
+                get_output=get_output,
+                compute_individual_gain=compute_individual_gain,
+                depth=depth,
+                use_cache=use_cache,
+                work_dir=job_dirs[index].path
+            )
+        except Exception as e:
+            logger.error(f"Job {index} failed: {e}")
+            return False
+
+    try:
+        configs = prepare_jobs(inputs, [job_dir.path for job_dir in job_dirs])
+        logger.info(f"Running {len(configs)} jobs with up to {max_workers} workers")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_job, i, config)
+                       for i, config in enumerate(configs)]
+            return [future.result() for future in futures]
+
+    finally:
+        for job_dir in job_dirs:
+            job_dir.cleanup()
+
+
+async def run_platform_async(config_file: str, bin_path: str):
+    """
+    Run the UDLF binary without blocking the event loop.
+
+    The binary's stdout is read as it is produced: each line is checked for
+    error keywords and fed to the log parser, so no temporary log file is
+    written.
+
+    Args:
+        config_file (str): Path to the configuration file.
+        bin_path (str): Path to the UDLF binary.
 
+    Returns:
+        tuple:
+            bool: True if errors were detected, False otherwise (as run_platform).
+            dict: Parsed log.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, verify_bin, config_file, bin_path)
+
+    cmd = [bin_path, config_file]
+    if operating_system == "windows":
+        cmd = ["cmd", "/c"] + cmd
+
+    logger.info(f"Running UDLF framework with config: {config_file}")
+    logger.debug(f"Command: {' '.join(cmd)}")
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+    except Exception as e:
+        logger.error(f"Failed to run UDLF binary: {e}")
+        return True, {}
+
+    log_parser = readData.LogParser()
+    error_flag = False
+    partial = ""
+    # characters split between two chunks are decoded once both are read
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        while True:
+            chunk = await process.stdout.read(1 << 16)
+            if not chunk:
+                partial += decoder.decode(b"", final=True)
+                break
+            lines = (partial + decoder.decode(chunk)).split("\n")
+            partial = lines.pop()
+            for line in lines:
+                if check_log_line(line):
+                    error_flag = True
+                log_parser.feed_line(line)
+        if partial:
+            if check_log_line(partial):
+                error_flag = True
+            log_parser.feed_line(partial)
+        await process.wait()
+    finally:
+        # cancelled or failed while reading: do not leave the binary running
+        if process.returncode is None:
+            logger.warning("UDLF run interrupted, killing the binary.")
+            process.kill()
+            await process.wait()
+
+    if not error_flag:
+        logger.info("UDLF run successfully.")
+    else:
+        logger.warning("UDLF run did not complete as expected.")
+
+    return error_flag, log_parser.close()
+
+
+async def run_with_config_async(
+    config_file: str = None,
+    get_output: bool = False,
+    compute_individual_gain: bool = False,
+    depth: int = -1,
+    visualization: bool = False
+):
+    """
+    asyncio version of runWithConfig. Many runs can be awaited together
+    (e.g. with asyncio.gather under an asyncio.Semaphore); file staging and
+    gain computation run in the default executor.
+
+    Returns:
+        OutputType or False: OutputType object with parsed results, or False if execution failed.
+    """
+    global bin_path
+    loop = asyncio.get_running_loop()
+
+    if not await loop.run_in_executor(None, validate_config_and_binary, config_file, bin_path):
+        return False
+
+    try:
+        run_config, stage_dir = await loop.run_in_executor(
+            None, stage_compressed_inputs, config_file)
+    except Exception as e:
+        logger.error(f"Failed to stage compressed inputs of {config_file}: {e}")
+        return False
+    try:
+        run_error, log_dict = await run_platform_async(run_config, bin_path)
+    finally:
+        if stage_dir is not None:
+            stage_dir.cleanup()
+    if run_error:
+        logger.error("UDLF execution failed.")
+        return False
+    logger.info("pyUDLF execution complete!")
+
+    return await loop.run_in_executor(
+        None, build_output, config_file, log_dict, get_output,
+        compute_individual_gain, depth, visualization)
+
+
+async def run_async(
+    input_type,
+    get_output: bool = False,
+    compute_individual_gain: bool = False,
+    depth: int = -1,
+    visualization: bool = False
+):
+    """
+    asyncio version of run: write the config of input_type to a temporary
+    file and await run_with_config_async.
+
+    Returns:
+        OutputType or False: OutputType object with parsed results, or False if execution failed.
+    """
+    if not os.path.isfile(input_type.config_path):
+        logger.error("Unable to run: input_type was not initialized correctly (missing config).")
+        return False
+
+    run_dir = scratch.ScratchDir(prefix="pyudlf_run_")
+    input_path = run_dir.join("config.ini")
+
+    try:
+        input_type.write_config(input_path)
+        logger.debug(f"Temporary config written: {input_path}")
+
+        return await run_with_config_async(
+            config_file=input_path,
+            get_output=get_output,
+            compute_individual_gain=compute_individual_gain,
+            depth=depth,
+            visualization=visualization
+        )
+
+    except Exception as e:
+        logger.error(f"Error during run execution: {e}")
+        return False
+
+    finally:
+        run_dir.cleanup()
+        logger.debug(f"Temporary config removed: {input_path}")
+
+
+def run_streaming(input_type, get_output: bool = False, timeout: float = None):
+    """
+    Run UDLF on in-memory ranked lists through named pipes (FIFOs).
+
+    The ranked lists given to InputType(input_files=[...], stream_inputs=True)
+    are written by a thread into FIFOs read by the binary, and the output
+    ranked list (or matrix) is parsed by another thread as the binary writes
+    it, so neither goes through the disk. The output is returned in memory
+    (OutputType.get_rks / get_matrix).
+
+    Falls back to a regular run with files when FIFOs are not available,
+    when the config makes the binary read its inputs more than once
+    (see fifoStream.needs_seek), or when the FIFO run fails. In particular
+    INPUT_FILE_FORMAT must be RK: with AUTO the binary reads the input once
+    to detect its format and again to load it. If the in-memory inputs
+    cannot be written to files, no fallback is attempted (the config would
+    run on its own INPUT_FILE instead) and False is returned.
+
+    Args:
+        input_type: InputType object with in-memory ranked lists.
+        get_output (bool, optional): If True, parse the log.
+        timeout (float, optional): Seconds before the binary is killed. A run
+                                   that times out is reported as failed (False),
+                                   not retried with files. Default is no limit.
+
+    Returns:
+        OutputType or False: OutputType object with parsed results, or False if execution failed.
+    """
+    global bin_path
+
+    data = input_type.input_files_list
+    in_memory = configGenerator.is_in_memory(data)
+
+    def run_with_files(reason):
+        logger.warning(f"{reason}, running with files.")
+        if in_memory and not input_type.pending_inputs:
+            logger.error("In-memory inputs are not pending (stream_inputs=False?) "
+                         "and cannot be written; not running.")
+            return False
+        return run(input_type, get_output=get_output)
+
+    if not in_memory or not fifoStream.fifo_supported():
+        return run_with_files("FIFO streaming unavailable")
+    # checked on the user's config, before set_input below resets the format
+    if fifoStream.needs_seek(input_type.parameters):
+        return run_with_files("Config needs seekable inputs (INPUT_FILE_FORMAT is not RK)")
+
+    parameters = copy.deepcopy(input_type.parameters)
+    list_parameters = list(input_type.list_parameters)
+
+    def param(name):
+        value = parameters.get(name)
+        return value[0].strip() if value else ""
+
+    with scratch.ScratchDir(prefix="pyudlf_fifo_") as run_dir:
+        input_paths = [run_dir.join("rks_{}".format(i + 1)) for i in range(len(data))]
+        # set_input resets INPUT_FILE_FORMAT to AUTO; the user's RK is restored
+        configGenerator.set_input(input_paths, parameters, list_parameters)
+        configGenerator.setParameter("INPUT_FILE_FORMAT", "RK", parameters)
+        numeric = np.issubdtype(np.asarray(data[0][0]).dtype, np.number)
+        configGenerator.setParameter("INPUT_RK_FORMAT", "NUM" if numeric else "STR", parameters)
+
+        writers = [fifoStream.FifoWriter(path, rks) for path, rks in zip(input_paths, data)]
+
+        reader = None
+        output_format = param("OUTPUT_FILE_FORMAT")
+        if param("OUTPUT_FILE") == "TRUE":
+            if output_format == "MATRIX":
+                dtype = np.float32
+            elif param("OUTPUT_RK_FORMAT") == "NUM":
+                dtype = np.int32
+            else:
+                dtype = str
+            output_base = run_dir.join("output")
+            reader = fifoStream.FifoReader(output_base + ".txt", dtype=dtype)
+            configGenerator.setParameter("OUTPUT_FILE_PATH", output_base, parameters)
+
+        config_file = run_dir.join("config.ini")
+        configGenerator.writeConfig(parameters, list_parameters, config_file)
+
+        threads = writers + ([reader] if reader is not None else [])
+        for thread in threads:
+            thread.start()
+        start = time.monotonic()
+        try:
+            run_error, log_out_path = run_platform(config_file, bin_path, timeout=timeout,
+                                                   work_dir=run_dir.path)
+        finally:
+            for thread in threads:
+                thread.release()
+
+        if run_error and timeout is not None and time.monotonic() - start >= timeout:
+            # retrying with files would take as long again
+            logger.error(f"UDLF run timed out after {timeout} seconds.")
+            return False
+
+        errors = [thread.error for thread in threads if thread.error is not None]
+        if run_error or errors:
+            for error in errors:
+                logger.warning(f"FIFO streaming error: {error}")
+            if os.path.exists(log_out_path):
+                os.remove(log_out_path)
+            return run_with_files("FIFO run failed")
+
+        # the log is in run_dir: parse it before the directory is removed
+        logger.info("pyUDLF execution complete!")
+        output = outputType.OutputType()
+        if get_output:
+            output.log_dict = parser.parse_log_and_cleanup(log_out_path)
+            output.log_path = param("OUTPUT_LOG_FILE_PATH")
+            output.list_path = param("INPUT_FILE_LIST")
+
+    if reader is not None:
+        if output_format == "MATRIX":
+            output.matrix_data = reader.data
+        else:
+            output.rks_data = reader.data
+    return output
@@ -0,0 +1,212 @@
+"""
+Binary format for ranked lists and matrices.
+
+A binary file is a fixed 32-byte header followed by a raw C-ordered payload:
+
+    magic (4s) | version (B) | dtype code (B) | reserved (2x) | rows (Q) | cols (Q) | reserved (8x)
+
+The payload is either int32 (ranked lists) or float32 (matrices), so readers
+can return np.memmap views and only the touched rows are paged in.
+"""
+
+import os
+import struct
+import numpy as np
+from pyUDLF.utils import readData, compression
+
+MAGIC = b"UDLF"
+VERSION = 1
+HEADER_FORMAT = "<4sBB2xQQ8x"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+DTYPE_CODES = {
+    ord("i"): np.dtype("<i4"),
+    ord("f"): np.dtype("<f4"),
+}
+RK_DTYPE = np.dtype("<i4")
+MATRIX_DTYPE = np.dtype("<f4")
+
+
+def _dtype_code(dtype):
+    for code, value in DTYPE_CODES.items():
+        if value == np.dtype(dtype):
+            return code
+    raise ValueError("Unsupported binary dtype: {}".format(dtype))
+
+
+def write_header(f, rows, cols, dtype):
+    """
+    Write the binary header at the current position of an open file.
+
+    Parameters:
+        f: File opened in binary write mode.
+        rows (int): Number of rows of the payload.
+        cols (int): Number of columns of the payload.
+        dtype: Payload dtype (int32 or float32).
+    """
+    f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION,
+                        _dtype_code(dtype), rows, cols))
+
+
+def read_header(path):
+    """
+    Read and validate the header of a binary file.
+
+    Parameters:
+        path (str): Path to the binary file.
+
+    Returns:
+        tuple: (rows, cols, dtype)
+    """
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError("File too small to be a binary UDLF file: {}".format(path))
+
+    magic, version, code, rows, cols = struct.unpack(HEADER_FORMAT, raw)
+    if magic != MAGIC:
+        raise ValueError("Invalid binary UDLF file (bad magic): {}".format(path))
+    if version != VERSION:
+        raise ValueError("Unsupported binary UDLF version {}: {}".format(version, path))
+    if code not in DTYPE_CODES:
+        raise ValueError("Unknown dtype code {}: {}".format(code, path))
+
+    return rows, cols, DTYPE_CODES[code]
+
+
+def is_binary_file(path):
+    """
+    Check whether a file starts with the binary UDLF magic.
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_binary(data, path, dtype=None):
+    """
+    Write a 2-D array (or list of lists) to the binary format.
+
+    Parameters:
+        data: 2-D array or list of lists.
+        path (str): Output path.
+        dtype: Payload dtype (default is inferred: int32 for integers, float32 otherwise).
+    """
+    data = np.asarray(data)
+    if dtype is None:
+        dtype = RK_DTYPE if np.issubdtype(data.dtype, np.integer) else MATRIX_DTYPE
+    data = np.ascontiguousarray(data, dtype=dtype)
+    if data.ndim != 2:
+        raise ValueError("Binary UDLF files store 2-D data only.")
+
+    with open(path, "wb") as f:
+        write_header(f, data.shape[0], data.shape[1], dtype)
+        data.tofile(f)
+
+
+def read_binary(path, mmap=True):
+    """
+    Read a binary file.
+
+    Parameters:
+        path (str): Path to the binary file.
+        mmap (bool): If True, return a read-only np.memmap view (O(1) open),
+                     otherwise load the payload into memory.
+
+    Returns:
+        numpy.ndarray or numpy.memmap of shape (rows, cols).
+    """
+    rows, cols, dtype = read_header(path)
+    if rows == 0 or cols == 0:
+        return np.empty((rows, cols), dtype=dtype)
+    if mmap:
+        return np.memmap(path, dtype=dtype, mode="r",
+                         offset=HEADER_SIZE, shape=(rows, cols))
+    with open(path, "rb") as f:
+        f.seek(HEADER_SIZE)
+        return np.fromfile(f, dtype=dtype, count=rows * cols).reshape(rows, cols)
+
+
+def _count_text_shape(text_path):
+    rows = 0
+    cols = 0
+    with compression.open_file(text_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if rows == 0:
+                cols = len(line.split())
+            rows += 1
+    return rows, cols
+
+
+def text_to_binary(text_path, bin_path, dtype=RK_DTYPE, chunk_rows=1024):
+    """
+    Convert a UDLF text ranked list or matrix to the binary format.
+    The text file is streamed in blocks of chunk_rows rows, so memory use
+    is bounded whatever the file size.
+
+    Parameters:
+        text_path (str): Path to the UDLF text file.
+        bin_path (str): Output path of the binary file.
+        dtype: RK_DTYPE for numeric ranked lists, MATRIX_DTYPE for matrices.
+        chunk_rows (int): Rows parsed per block.
+
+    Returns:
+        str: bin_path
+    """
+    rows, cols = _count_text_shape(text_path)
+
+    # write to a temporary name first so an interrupted conversion never
+    # leaves a truncated file that looks up to date
+    tmp_path = bin_path + ".tmp"
+    with open(tmp_path, "wb") as fout:
+        write_header(fout, rows, cols, dtype)
+        for block in readData.iter_matrix_rows(text_path, chunk_rows, dtype=dtype):
+            block.tofile(fout)
+    os.replace(tmp_path, bin_path)
+
+    return bin_path
+
+
+def binary_to_text(bin_path, text_path, chunk_rows=1024):
+    """
+    Convert a binary file back to the UDLF text format.
+    The memory-mapped payload is written in blocks of chunk_rows rows.
+
+    Parameters:
+        bin_path (str): Path to the binary file.
+        text_path (str): Output path of the text file.
+        chunk_rows (int): Rows written per block.
+
+    Returns:
+        str: text_path
+    """
+    data = read_binary(bin_path, mmap=True)
+    # 9 significant digits round-trip any float32 exactly
+    fmt = "%d" if np.issubdtype(data.dtype, np.integer) else "%.9g"
+    with compression.open_file(text_path, "w") as f:
+        for start in range(0, data.shape[0], chunk_rows):
+            np.savetxt(f, data[start:start + chunk_rows], fmt=fmt, delimiter=" ")
+    return text_path
+
+
+def get_binary_sidecar(text_path, dtype=RK_DTYPE):
+    """
+    Return the path of an up-to-date binary sidecar (text_path + ".bin"),
+    converting the text file if the sidecar is missing or older.
+
+    Parameters:
+        text_path (str): Path to the UDLF text file.
+        dtype: RK_DTYPE for numeric ranked lists, MATRIX_DTYPE for matrices.
+
+    Returns:
+        str: Path to the binary sidecar.
+    """
+    bin_path = text_path + ".bin"
+    if (not os.path.isfile(bin_path)
+            or os.path.getmtime(bin_path) < os.path.getmtime(text_path)):
+        text_to_binary(text_path, bin_path, dtype=dtype)
+    return bin_path
@@ -0,0 +1,172 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from pyUDLF.utils import compression, readData
+
+# maximum number of indexes (class indexes and vocabularies) kept in memory
+CLASS_INDEX_CACHE_SIZE = 8
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class Vocabulary:
+    """
+    Dictionary encoding of the image names of a lists file.
+
+    Attributes:
+        names -> image names, in the order of the lists file
+        name_to_id -> image name -> position in the lists file
+    """
+
+    def __init__(self, lists_path):
+        """
+        Read the lists file.
+        """
+        self.lists_path = lists_path
+        with compression.open_file(lists_path) as f:
+            self.names = [x.strip() for x in f if x.strip()]
+        self.name_to_id = {name: i for i, name in enumerate(self.names)}
+        self._names_array = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def encode(self, names, dtype=np.int32):
+        """
+        Convert a sequence of image names into an array of ids.
+        """
+        return np.fromiter(map(self.name_to_id.__getitem__, names),
+                           dtype=dtype, count=len(names))
+
+    def decode(self, ids):
+        """
+        Convert an array of ids (any shape) back to image names, vectorized.
+        """
+        if self._names_array is None:
+            self._names_array = np.array(self.names)
+        return self._names_array[np.asarray(ids)]
+
+
+class ClassIndex:
+    """
+    Label-encoded classes of a dataset, built from the UDLF lists and classes files.
+
+    Attributes:
+        names -> image names, in the order of the lists file
+        class_ids -> int32 array with the class id of each image
+        class_names -> original class label of each class id (int when numeric)
+        class_sizes -> number of images of each class id (bincount)
+        name_to_index -> image name -> position in the lists file
+        class_to_id -> original class label -> class id
+    """
+
+    def __init__(self, lists_path, classes_path):
+        """
+        Read the lists and classes files and encode the classes.
+        """
+        self.lists_path = lists_path
+        self.classes_path = classes_path
+
+        vocabulary = get_vocabulary(lists_path)
+        self.names = vocabulary.names
+        self.name_to_index = vocabulary.name_to_id
+
+        classes_dict = dict()
+        with compression.open_file(classes_path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                key = line.split(':')[0]
+                value = line.split(':')[-1].strip()
+                try:
+                    value = int(value)
+                except ValueError:
+                    pass
+                classes_dict[key] = value
+
+        self.class_to_id = dict()
+        self.class_names = []
+        class_ids = np.empty(len(self.names), dtype=np.int32)
+        for i, name in enumerate(self.names):
+            label = classes_dict[name]
+            if label not in self.class_to_id:
+                self.class_to_id[label] = len(self.class_names)
+                self.class_names.append(label)
+            class_ids[i] = self.class_to_id[label]
+
+        self.class_ids = class_ids
+        self.class_sizes = np.bincount(class_ids, minlength=len(self.class_names))
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def n_classes(self):
+        return len(self.class_names)
+
+    def get_classes_list(self):
+        """
+        Return a list with the class of each element in order,
+        as returned by readData.read_classes.
+        """
+        return [self.class_names[i] for i in self.class_ids]
+
+
+def _get_cached(key, factory):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    value = factory()
+
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > CLASS_INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return value
+
+
+def get_vocabulary(lists_path):
+    """
+    Return the Vocabulary of a lists file, memoized by (path, mtime, size).
+
+    Parameters:
+        lists_path -> path of the lists file
+
+    Returns:
+        Vocabulary
+    """
+    key = ("vocabulary", readData._file_key(lists_path))
+    return _get_cached(key, lambda: Vocabulary(lists_path))
+
+
+def get_class_index(lists_path, classes_path):
+    """
+    Return the ClassIndex of a (lists, classes) pair.
+    Indexes are memoized by (path, mtime, size) of both files, so a file
+    changed on disk is read again; at most CLASS_INDEX_CACHE_SIZE indexes
+    are kept (least recently used first out).
+
+    Parameters:
+        lists_path -> path of the lists file
+        classes_path -> path of the classes file
+
+    Returns:
+        ClassIndex
+    """
+    key = ("classes", readData._file_key(lists_path), readData._file_key(classes_path))
+    return _get_cached(key, lambda: ClassIndex(lists_path, classes_path))
+
+
+def clear_cache():
+    """
+    Remove all memoized class indexes and vocabularies.
+    """
+    with _cache_lock:
+        _cache.clear()
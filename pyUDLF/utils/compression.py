@@ -0,0 +1,177 @@
+"""
+Transparent compressed file I/O.
+
+Files are detected as compressed by extension (.gz, .bz2, .xz, .zst, .lz4)
+or, when reading, by their magic bytes. gzip, bz2 and xz use the standard
+library; zstd and lz4 are used only if the zstandard / lz4 modules are
+installed.
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+import logging
+from pyUDLF.utils import scratch
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+    ".lz4": "lz4",
+}
+
+MAGIC_BYTES = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+    b"\x04\x22\x4d\x18": "lz4",
+}
+
+
+def get_compression(path, mode="r"):
+    """
+    Detect the compression of a file.
+
+    Parameters:
+        path (str): File path.
+        mode (str): Open mode; magic bytes are only checked when reading.
+
+    Returns:
+        str or None: "gzip", "bz2", "xz", "zstd", "lz4" or None for plain files.
+    """
+    path = str(path)
+    ext = os.path.splitext(path)[1].lower()
+    if ext in EXTENSIONS:
+        return EXTENSIONS[ext]
+
+    if "r" in mode and os.path.isfile(path):
+        with open(path, "rb") as f:
+            head = f.read(6)
+        for magic, name in MAGIC_BYTES.items():
+            if head.startswith(magic):
+                return name
+
+    return None
+
+
+def is_compressed(path):
+    """
+    Check whether a file is compressed (by extension or magic bytes).
+    """
+    return get_compression(path) is not None
+
+
+def open_file(path, mode="r", buffering=-1):
+    """
+    Open a plain or compressed file, with the same semantics as open().
+    Text modes ("r", "w", "a") are opened as text for compressed files too.
+
+    Parameters:
+        path (str): File path.
+        mode (str): Open mode.
+        buffering (int): Buffer size for plain files, as in open().
+
+    Returns:
+        file object
+    """
+    compression = get_compression(path, mode)
+    if compression is None:
+        return open(path, mode, buffering=buffering)
+
+    if "b" not in mode and "t" not in mode:
+        mode = mode.replace("+", "") + "t"
+    else:
+        mode = mode.replace("+", "")
+
+    if compression == "gzip":
+        return gzip.open(path, mode)
+    if compression == "bz2":
+        return bz2.open(path, mode)
+    if compression == "xz":
+        return lzma.open(path, mode)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstandard module is required to open {}".format(path))
+        return zstandard.open(path, mode)
+    if compression == "lz4":
+        if lz4_frame is None:
+            raise ImportError("lz4 module is required to open {}".format(path))
+        return lz4_frame.open(path, mode)
+
+    raise ValueError("Unsupported compression: {}".format(compression))
+
+
+def stage_plain(path, scratch_dir=None):
+    """
+    Decompress a file into a scratch directory, for consumers (such as the
+    UDLF binary) that need plain files. Plain files are returned as is.
+
+    Parameters:
+        path (str): File path.
+        scratch_dir (str): Directory for the decompressed copy
+                           (default is a new temporary directory).
+
+    Returns:
+        str: Path to a plain file with the same content.
+    """
+    if not is_compressed(path):
+        return path
+
+    if scratch_dir is None:
+        scratch_dir = tempfile.mkdtemp(prefix="pyudlf_stage_",
+                                       dir=scratch.get_scratch_root())
+
+    name = os.path.basename(str(path))
+    root, ext = os.path.splitext(name)
+    if ext.lower() in EXTENSIONS:
+        name = root
+    plain_path = os.path.join(scratch_dir, name)
+
+    with open_file(path, "rb") as fin, open(plain_path, "wb") as fout:
+        shutil.copyfileobj(fin, fout, 1 << 20)
+    logger.debug(f"Staged {path} as plain file {plain_path}")
+
+    return plain_path
+
+
+def compress_file(path, compression="gzip", remove_original=False):
+    """
+    Compress a plain file (for example an output to be archived).
+
+    Parameters:
+        path (str): Plain file path.
+        compression (str): "gzip", "bz2", "xz", "zstd" or "lz4".
+        remove_original (bool): If True, delete the plain file afterwards.
+
+    Returns:
+        str: Path to the compressed file.
+    """
+    extensions = {name: ext for ext, name in EXTENSIONS.items()}
+    if compression not in extensions:
+        raise ValueError("Unsupported compression: {}".format(compression))
+
+    out_path = str(path) + extensions[compression]
+    with open(path, "rb") as fin, open_file(out_path, "wb") as fout:
+        shutil.copyfileobj(fin, fout, 1 << 20)
+
+    if remove_original:
+        os.remove(path)
+
+    return out_path
@@ -2,6 +2,7 @@ from pyUDLF.utils import readData
 from pyUDLF.utils import writeData
 import os.path
 import re
+import numpy as np
 
 
 def initParameters(config_path, parameters, list_parameters):
@@ -27,15 +28,45 @@ def initParameters(config_path, parameters, list_parameters):
     return parameters, list_parameters
 
 
-def write_input_files(data, path):
+def is_in_memory(value):
+    """
+    Check whether input files are in-memory ranked lists (a list of lists
+    or arrays, or an array) instead of paths
+
+    Parameters:
+        value -> input files, as given to InputType
+
+    Returns:
+        True for in-memory ranked lists
+    """
+    if isinstance(value, np.ndarray):
+        return True
+    return (isinstance(value, list) and len(value) > 0
+            and isinstance(value[0], (list, np.ndarray)))
+
+
+def write_input_files(data, path, compression=None):
+    """
+    Write in-memory ranked lists to rks_N files
+
+    Parameters:
+        data -> list of ranked lists (lists of lists or arrays)
+        path -> directory where the files are written
+        compression -> optional extension (".gz", ".bz2", ".xz", ".zst", ".lz4");
+                       compressed inputs are staged as plain files at run time
+
+    Returns:
+        list with the written paths
+    """
     data_paths = []
+    suffix = "" if compression is None else compression
     cont = 1
     for i in range(len(data)):
-        temp = os.path.join("/rks_", cont)
+        temp = "rks_{}{}".format(cont, suffix)
         aux = os.path.join(path, temp)
         while os.path.isfile(aux):
             cont = cont + 1
-            temp = os.path.join("/rks_", cont)
+            temp = "rks_{}{}".format(cont, suffix)
             aux = os.path.join(path, temp)
 
         data_paths.append(aux)
@@ -122,18 +153,23 @@ def writeConfig(parameters, list_parameters, path="new_config.ini"):
         list_parameters -> list of parameters in config order
         path -> path with the name of the new config
     """
-    f = open(path, "w+")
+    lines = []
     for param in list_parameters:
         # print("{}={}".format(param, parameters[param]), file=f)
         if len(parameters[param]) > 1:
-            f.write("{:<37} = {:<15} #{:<30}\n".format(
+            lines.append("{:<37} = {:<15} #{:<30}\n".format(
                 param, parameters[param][0].strip(), parameters[param][1]))
         else:
-            f.write("{:<37} = {:<15}\n".format(
+            lines.append("{:<37} = {:<15}\n".format(
                 param, parameters[param][0].strip()))
 
+    f = open(path, "w+")
+    f.writelines(lines)
     f.close()
 
+    # the written config is already known, avoid parsing it again
+    readData.cache_config_text(path, lines)
+
 
 def listParameters(list_parameters):
     """
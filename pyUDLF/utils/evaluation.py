@@ -1,39 +1,169 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from pyUDLF.utils import classIndex, readData, scratch
 
+# maximum number of baseline (before) measures kept in memory
+BASELINE_CACHE_SIZE = 32
 
-def compute_map(rks, classes_list, map_depth=-1):
-    map_list = []
-    class_size_dict = get_class_size_dict(classes_list)
-    
-    if map_depth == -1:
+# default number of queries per evaluate() block; fixed, so that the block
+# sums (and their rounding) are the same for any number of workers
+EVAL_CHUNK_ROWS = 1024
+
+_baseline_cache = OrderedDict()
+_baseline_lock = threading.Lock()
+
+
+def get_class_arrays(classes_list):
+    """
+    Return the label-encoded class of each element and the size of each class.
+
+    Parameters:
+        classes_list -> list/array with the class of each element, or a ClassIndex
+
+    Returns:
+        class_ids -> int array with the class id of each element
+        class_sizes -> int array with the size of each class id
+    """
+    if isinstance(classes_list, classIndex.ClassIndex):
+        return classes_list.class_ids, classes_list.class_sizes
+    _, class_ids = np.unique(np.asarray(classes_list), return_inverse=True)
+    class_ids = class_ids.ravel()
+    return class_ids, np.bincount(class_ids)
+
+
+def get_rank_array(rks, depth):
+    """
+    Return the first depth positions of the ranked lists as a 2-D integer array.
+
+    Parameters:
+        rks -> list of lists or 2-D array
+        depth -> number of positions to keep
+
+    Returns:
+        2-D array of shape (len(rks), depth)
+    """
+    if isinstance(rks, np.ndarray):
+        if rks.ndim != 2 or rks.shape[1] < depth:
+            raise IndexError("Ranked lists are shorter than depth {}.".format(depth))
+        return rks[:, :depth]
+
+    if any(len(rk) < depth for rk in rks):
+        raise IndexError("Ranked lists are shorter than depth {}.".format(depth))
+    return np.array([rk[:depth] for rk in rks], dtype=np.int64).reshape(len(rks), depth)
+
+
+def get_relevance_matrix(rks, class_ids, depth):
+    """
+    Gather the relevance of every position of every ranked list:
+    rel[i, j] is True when the j-th image of query i has the class of i.
+
+    Parameters:
+        rks -> list of lists or 2-D array (query i is row i)
+        class_ids -> int array with the class id of each element
+        depth -> number of positions to evaluate
+
+    Returns:
+        bool array of shape (len(rks), depth)
+    """
+    ranks = get_rank_array(rks, depth)
+    query_classes = class_ids[:ranks.shape[0]]
+    return class_ids[ranks] == query_classes[:, None]
+
+
+def average_precision(relevance, query_sizes):
+    """
+    Average precision of each query from its relevance matrix.
+    Precisions are accumulated position by position (cumsum), so the
+    values are identical to the sequential per-query sum.
+    """
+    depth = relevance.shape[1]
+    hits = np.cumsum(relevance, axis=1)
+    positions = np.arange(1, depth + 1, dtype=np.float64)
+    precisions = np.where(relevance, hits / positions, 0.0)
+    if depth == 0:
+        return np.zeros(relevance.shape[0])
+    return np.cumsum(precisions, axis=1)[:, -1] / query_sizes
+
+
+def truncated_average_precision(relevance, query_sizes):
+    """
+    Average precision at depth k (AP@k) of each query: the precisions are
+    normalized by min(k, class size) instead of the class size, so a
+    perfect top-k list scores 1 even for classes larger than k (unlike
+    average_precision cut at depth k).
+    """
+    depth = relevance.shape[1]
+    if depth == 0:
+        return np.zeros(relevance.shape[0])
+    hits = np.cumsum(relevance, axis=1)
+    positions = np.arange(1, depth + 1, dtype=np.float64)
+    precisions = np.where(relevance, hits / positions, 0.0)
+    return precisions.sum(axis=1) / np.minimum(query_sizes, depth)
+
+
+def ndcg(relevance, query_sizes):
+    """
+    nDCG at depth k of each query, with binary relevance:
+    DCG = sum(rel_j / log2(j + 1)), normalized by the DCG of an ideal list
+    with min(k, class size) relevant images at the top.
+    """
+    depth = relevance.shape[1]
+    if depth == 0:
+        return np.zeros(relevance.shape[0])
+    discounts = 1.0 / np.log2(np.arange(2, depth + 2, dtype=np.float64))
+    ideal = np.cumsum(discounts)[np.minimum(query_sizes, depth) - 1]
+    return (relevance @ discounts) / ideal
+
+
+def reciprocal_rank(relevance):
+    """
+    Reciprocal of the position of the first relevant image of each query
+    (0 when there is none within the depth).
+    """
+    first = np.argmax(relevance, axis=1)
+    found = relevance[np.arange(relevance.shape[0]), first]
+    return np.where(found, 1.0 / (first + 1), 0.0)
+
+
+def r_precision(relevance, query_sizes):
+    """
+    Precision at R of each query, R being the size of its class.
+    When R is larger than the depth, only the first depth positions count.
+    """
+    depth = relevance.shape[1]
+    if depth == 0:
+        return np.zeros(relevance.shape[0])
+    hits = np.cumsum(relevance, axis=1)
+    cut = np.minimum(query_sizes, depth) - 1
+    return hits[np.arange(relevance.shape[0]), cut] / query_sizes
+
+
+def _check_depth(rks, depth, warning):
+    if depth == -1:
         print("WARNING: depth of the ranked_list size not set, setting to max ranked list size!")
-        map_depth = len(rks)
-
-
-    if len(rks) <= map_depth:
-        if len(rks) < map_depth:
-            print(
-                "WARNING: depth larger than the ranked_list size, set depth to max ranked list size!")
-        map_depth = len(rks)
-        # print(map_depth)
-
-    for i, rk in enumerate(rks):
-        acum = 0
-        value = 0
-        # print(rk)
-        # cl_i = class_size_dict[i]#i//class_size
-        cl_i = classes_list[i]
-        # if len(rks)<=depth
-        # else colocar tamanho maximo q eh len(rks)dar um warnin
-
-        for j in range(map_depth):
-            cl_j = classes_list[rk[j]]
-            if cl_i == cl_j:
-                value += 1
-                acum += value/(j+1)
-
-        map_list.append(acum/class_size_dict[cl_i])
-        # map_list.append(acum/class_size_dict[cl_i]) ###
+        depth = len(rks)
+
+    if len(rks) <= depth:
+        if len(rks) < depth:
+            print(warning)
+        depth = len(rks)
+    return depth
+
+
+def compute_map(rks, classes_list, map_depth=-1):
+    map_depth = _check_depth(
+        rks, map_depth,
+        "WARNING: depth larger than the ranked_list size, set depth to max ranked list size!")
+
+    class_ids, class_sizes = get_class_arrays(classes_list)
+    relevance = get_relevance_matrix(rks, class_ids, map_depth)
+    query_sizes = class_sizes[class_ids[:relevance.shape[0]]]
+
+    map_list = average_precision(relevance, query_sizes).tolist()
     map_value = np.mean(map_list)
     return round(map_value, 4), map_list
 
@@ -50,101 +180,480 @@ def get_class_size_dict(class_list):
 
 
 def compute_recall(rks, classes_list, r_depth=-1):
-    recall_list = []
-    class_size_dict = get_class_size_dict(classes_list)
-    
-    if r_depth == -1:
-        print("WARNING: depth of the ranked_list size not set, setting to max ranked list size!")
-        r = len(rks)
-        
-    if len(rks) <= r_depth:
-        if len(rks) < r_depth:
-            print(
-                "Warning, depth larger than the ranked_list size, set depth to max ranked list size!")
-        r_depth = len(rks)
-
-    for i, rk in enumerate(rks):
-        acum = 0
-        # print(rk)
-        cl_i = classes_list[i]
-        for j in range(r_depth):
-            cl_j = classes_list[rk[j]]
-            if cl_i == cl_j:
-                acum += 1
-
-        recall_list.append(acum/class_size_dict[cl_i])
-        # map_list.append(acum/class_size_dict[cl_i]) ###
+    r_depth = _check_depth(
+        rks, r_depth,
+        "Warning, depth larger than the ranked_list size, set depth to max ranked list size!")
+
+    class_ids, class_sizes = get_class_arrays(classes_list)
+    relevance = get_relevance_matrix(rks, class_ids, r_depth)
+    query_sizes = class_sizes[class_ids[:relevance.shape[0]]]
+
+    recall_list = (relevance.sum(axis=1) / query_sizes).tolist()
     r_value = np.mean(recall_list)
     return round(r_value, 4), recall_list
 
 
 def compute_precision(rks, classes_list, p_depth=-1):
-    precision_list = []
-    class_size_dict = get_class_size_dict(classes_list)
-    if p_depth == -1:
-        print("WARNING: depth of the ranked_list size not set, setting to max ranked list size!")
-        p_depth = len(rks)
-        
-    if len(rks) <= p_depth:
-        if len(rks) < p_depth:
-            print(
-                "Warning, depth larger than the ranked_list size, set depth to max ranked list size!")
-        p_depth = len(rks)
-
-    for i, rk in enumerate(rks):
-        acum = 0
-        # print(rk)
-        cl_i = classes_list[i]
-        for j in range(p_depth):
-            cl_j = classes_list[rk[j]]
-            if cl_i == cl_j:
-                acum += 1
-
-        precision_list.append(acum/p_depth)
-        # map_list.append(acum/class_size_dict[cl_i]) ###
+    p_depth = _check_depth(
+        rks, p_depth,
+        "Warning, depth larger than the ranked_list size, set depth to max ranked list size!")
+
+    class_ids, _ = get_class_arrays(classes_list)
+    relevance = get_relevance_matrix(rks, class_ids, p_depth)
+
+    precision_list = (relevance.sum(axis=1) / p_depth).tolist()
     p_value = np.mean(precision_list)
     return round(p_value, 4), precision_list
 
 
-def compute_gain(before_rks, after_rks, classes_list, depth=-1, measure="MAP", verbose=True):
-    
+def _compute_on_relevance(rks, classes_list, depth, function):
+    class_ids, class_sizes = get_class_arrays(classes_list)
+    relevance = get_relevance_matrix(rks, class_ids, depth)
+    query_sizes = class_sizes[class_ids[:relevance.shape[0]]]
+
+    value_list = function(relevance, query_sizes).tolist()
+    value = np.mean(value_list)
+    return round(value, 4), value_list
+
+
+def compute_map_at_k(rks, classes_list, k=-1):
+    k = _check_depth(
+        rks, k,
+        "WARNING: depth larger than the ranked_list size, set depth to max ranked list size!")
+    return _compute_on_relevance(rks, classes_list, k, truncated_average_precision)
+
+
+def compute_ndcg(rks, classes_list, k=-1):
+    k = _check_depth(
+        rks, k,
+        "WARNING: depth larger than the ranked_list size, set depth to max ranked list size!")
+    return _compute_on_relevance(rks, classes_list, k, ndcg)
+
+
+def compute_mrr(rks, classes_list, depth=-1):
+    depth = _check_depth(
+        rks, depth,
+        "WARNING: depth larger than the ranked_list size, set depth to max ranked list size!")
+    return _compute_on_relevance(rks, classes_list, depth,
+                                 lambda relevance, _: reciprocal_rank(relevance))
+
+
+def compute_r_precision(rks, classes_list, depth=-1):
+    depth = _check_depth(
+        rks, depth,
+        "WARNING: depth larger than the ranked_list size, set depth to max ranked list size!")
+    return _compute_on_relevance(rks, classes_list, depth, r_precision)
+
+
+def get_class_labels(classes_list):
+    """
+    Return the original class label of each class id of get_class_arrays.
+    """
+    if isinstance(classes_list, classIndex.ClassIndex):
+        return list(classes_list.class_names)
+    return np.unique(np.asarray(classes_list)).tolist()
+
+
+def per_class_mean(values, classes_list):
+    """
+    Mean of per-query values (e.g. compute_map(...)[1]) over the queries of
+    each class, with one bincount pass.
+
+    Parameters:
+        values -> value of each query (query i is element i)
+        classes_list -> class of each element, or a ClassIndex
+
+    Returns:
+        means -> float array indexed by class id (nan for classes without queries)
+        counts -> int array with the number of queries of each class id
+    """
+    values = np.asarray(values, dtype=np.float64)
+    class_ids, class_sizes = get_class_arrays(classes_list)
+    query_classes = class_ids[:len(values)]
+
+    counts = np.bincount(query_classes, minlength=len(class_sizes))
+    sums = np.bincount(query_classes, weights=values, minlength=len(class_sizes))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return means, counts
+
+
+def per_class_gain(before_values, after_values, classes_list):
+    """
+    Mean gain (after - before) of the queries of each class.
+
+    Returns:
+        gains -> float array indexed by class id
+        counts -> int array with the number of queries of each class id
+    """
+    gains = np.asarray(after_values, dtype=np.float64) - np.asarray(before_values, dtype=np.float64)
+    return per_class_mean(gains, classes_list)
+
+
+def per_size_bucket_mean(values, classes_list, bins=None):
+    """
+    Mean of per-query values grouped by the size of the query class.
+
+    Parameters:
+        values -> value of each query
+        classes_list -> class of each element, or a ClassIndex
+        bins -> increasing bucket edges of the class size (default powers of 2:
+                1, 2, 4, 8, ...); bucket b holds sizes in [bins[b], bins[b + 1])
+
+    Returns:
+        bins -> bucket edges
+        means -> float array indexed by bucket (nan for empty buckets)
+        counts -> int array with the number of queries of each bucket
+    """
+    values = np.asarray(values, dtype=np.float64)
+    class_ids, class_sizes = get_class_arrays(classes_list)
+    query_sizes = class_sizes[class_ids[:len(values)]]
+
+    if bins is None:
+        top = int(np.ceil(np.log2(max(int(class_sizes.max()), 1) + 1)))
+        bins = 2 ** np.arange(top + 1)
+    bins = np.asarray(bins)
+
+    buckets = np.searchsorted(bins, query_sizes, side="right") - 1
+    n_buckets = len(bins) - 1
+    valid = (buckets >= 0) & (buckets < n_buckets)
+
+    counts = np.bincount(buckets[valid], minlength=n_buckets)
+    sums = np.bincount(buckets[valid], weights=values[valid], minlength=n_buckets)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return bins, means, counts
+
+
+def _evaluate_block(ranks, class_ids, class_sizes, query_classes,
+                    metrics, depths, map_depth, curves):
+    """
+    Evaluate one block of queries.
+
+    Returns:
+        per_query -> {key: array with the value of each query of the block}
+        curve_sums -> {"MAP", "P", "Recall": sum over the block of each curve}
+    """
+    depth = ranks.shape[1]
+    relevance = class_ids[ranks] == query_classes[:, None]
+    query_sizes = class_sizes[query_classes]
+
+    hits = np.cumsum(relevance, axis=1)
+    positions = np.arange(1, depth + 1, dtype=np.float64)
+
+    per_query = dict()
+    if "MAP" in metrics or curves:
+        precisions = np.where(relevance, hits / positions, 0.0)
+        ap_curve = np.cumsum(precisions, axis=1) / query_sizes[:, None]
+        if "MAP" in metrics and map_depth > 0:
+            per_query["MAP"] = ap_curve[:, map_depth - 1]
+    if "MRR" in metrics:
+        per_query["MRR"] = reciprocal_rank(relevance[:, :map_depth])
+    if "R-PRECISION" in metrics:
+        per_query["R-Precision"] = r_precision(relevance[:, :map_depth], query_sizes)
+    for k in depths:
+        if k < 1:
+            continue
+        if "PRECISION" in metrics:
+            per_query["P@{}".format(k)] = hits[:, k - 1] / k
+        if "RECALL" in metrics:
+            per_query["Recall@{}".format(k)] = hits[:, k - 1] / query_sizes
+        if "MAP@K" in metrics:
+            per_query["MAP@{}".format(k)] = truncated_average_precision(
+                relevance[:, :k], query_sizes)
+        if "NDCG" in metrics:
+            per_query["nDCG@{}".format(k)] = ndcg(relevance[:, :k], query_sizes)
+
+    curve_sums = dict()
+    if curves:
+        curve_sums["MAP"] = ap_curve.sum(axis=0)
+        curve_sums["P"] = (hits / positions).sum(axis=0)
+        curve_sums["Recall"] = (hits / query_sizes[:, None]).sum(axis=0)
+    return per_query, curve_sums
+
+
+def _evaluate_shared(ranks_path, ranks_shape, ranks_dtype, class_path, n_elements,
+                     class_sizes, start, stop, metrics, depths, map_depth, curves):
+    """
+    Worker of the parallel evaluation: attach to the shared rank and class
+    arrays and evaluate the queries start:stop.
+    """
+    ranks = np.memmap(ranks_path, dtype=ranks_dtype, mode="r", shape=ranks_shape)
+    class_ids = np.memmap(class_path, dtype=np.int64, mode="r", shape=(n_elements,))
+    class_ids = np.asarray(class_ids)
+    return _evaluate_block(np.asarray(ranks[start:stop]), class_ids, class_sizes,
+                           class_ids[start:stop], metrics, depths, map_depth, curves)
+
+
+def _share_array(rks, depth, chunk_rows, shared_dir):
+    """
+    Copy the first depth positions of the ranked lists into a file-backed
+    buffer in shared_dir (a scratch directory), chunk by chunk.
+    """
+    dtype = rks.dtype if isinstance(rks, np.ndarray) else np.dtype(np.int64)
+    shape = (len(rks), depth)
+    path = os.path.join(shared_dir, "ranks.bin")
+    out = np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+    for start in range(0, shape[0], chunk_rows):
+        out[start:start + chunk_rows] = get_rank_array(rks[start:start + chunk_rows], depth)
+    out.flush()
+    del out
+    return path, shape, dtype
+
+
+def _evaluate_parallel(rks, class_ids, class_sizes, depth, bounds, workers, args):
+    itemsize = rks.dtype.itemsize if isinstance(rks, np.ndarray) else 8
+    expected_bytes = len(rks) * depth * itemsize + len(class_ids) * 8
+    shared_dir = scratch.ScratchDir(prefix="pyudlf_eval_", expected_bytes=expected_bytes)
+    try:
+        ranks_path, ranks_shape, ranks_dtype = _share_array(
+            rks, depth, bounds[0][1] - bounds[0][0], shared_dir.path)
+        class_path = shared_dir.join("classes.bin")
+        np.asarray(class_ids, dtype=np.int64).tofile(class_path)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_evaluate_shared, ranks_path, ranks_shape,
+                                       ranks_dtype, class_path, len(class_ids),
+                                       class_sizes, start, stop, *args)
+                       for start, stop in bounds]
+            # gathered in query order, whatever the order workers finish
+            return [future.result() for future in futures]
+    finally:
+        shared_dir.cleanup()
+
+
+def evaluate(rks, classes_list, metrics=("MAP", "PRECISION", "RECALL"),
+             depths=(5, 10, 20, 50, 100), map_depth=-1, curves=False,
+             chunk_rows=None, workers=1):
+    """
+    Compute several metrics at several depths in a single pass.
+    The relevance matrix is built once, at the largest depth needed, and
+    every metric is derived from its cumulative sums.
+
+    With chunk_rows, queries are evaluated in blocks of chunk_rows rows, so
+    only one block of the relevance matrix is in memory at a time. With
+    workers > 1 (None for all CPUs), the blocks are evaluated by a process
+    pool attached to a shared copy of the rank and class arrays. Blocks are
+    always reduced in query order, so the results do not depend on the
+    number of workers.
+
+    Parameters:
+        rks -> list of lists or 2-D array (query i is row i)
+        classes_list -> class of each element, or a ClassIndex
+        metrics -> any of "MAP", "PRECISION", "RECALL", "MAP@K", "NDCG",
+                   "MRR", "R-PRECISION"
+        depths -> depths k of P@k, Recall@k, MAP@k and nDCG@k
+        map_depth -> depth of MAP, MRR and R-Precision
+                     (default -1, the largest available depth)
+        curves -> if True, also return MAP, P@k and Recall@k cut at every
+                  depth k (see "curves" below)
+        chunk_rows -> number of queries per block (default None, EVAL_CHUNK_ROWS)
+        workers -> number of processes (default 1)
+
+    Returns:
+        dictionary with
+            "values" -> {"MAP": float, "P@k": float, "Recall@k": float,
+                         "MAP@k": float, "nDCG@k": float, "MRR": float,
+                         "R-Precision": float}
+            "per_query" -> same keys, arrays with the value of each query
+            "curves" -> {"MAP": array, "P": array, "Recall": array}, index k-1
+                        (only when curves is True)
+
+    "MAP" always divides the precisions by the class size, as the UDLF log:
+    curves["MAP"][k - 1] is values["MAP"] with map_depth=k. "MAP@k" is the
+    truncated AP@k, divided by min(k, class size) (see
+    truncated_average_precision), so the two differ when k is smaller than
+    the class size.
+    """
+    metrics = [metric.upper() for metric in metrics]
+    depths = sorted(set(int(k) for k in depths))
+    n_queries = len(rks)
+    n_cols = len(rks[0]) if n_queries else 0
+
+    max_depth = max(depths + [map_depth if map_depth != -1 else 0])
+    full_depth = ("MAP" in metrics or "MRR" in metrics or "R-PRECISION" in metrics)
+    if map_depth == -1 and (full_depth or curves):
+        max_depth = n_cols
+    if max_depth > n_cols:
+        print("WARNING: depth {} larger than the ranked_list size, "
+              "set depth to {}!".format(max_depth, n_cols))
+        max_depth = n_cols
+        depths = [k for k in depths if k <= max_depth]
+    if map_depth == -1 or map_depth > max_depth:
+        map_depth = max_depth
+
+    class_ids, class_sizes = get_class_arrays(classes_list)
+    args = (metrics, depths, map_depth, curves)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_rows is None:
+        chunk_rows = EVAL_CHUNK_ROWS
+    chunk_rows = max(1, chunk_rows)
+    bounds = [(start, min(start + chunk_rows, n_queries))
+              for start in range(0, n_queries, chunk_rows)]
+
+    if workers > 1 and len(bounds) > 1:
+        blocks = _evaluate_parallel(rks, class_ids, class_sizes, max_depth,
+                                    bounds, workers, args)
+    else:
+        blocks = [_evaluate_block(get_rank_array(rks[start:stop], max_depth),
+                                  class_ids, class_sizes, class_ids[start:stop], *args)
+                  for start, stop in bounds]
+
+    per_query = dict()
+    for key in (blocks[0][0] if blocks else {}):
+        per_query[key] = np.concatenate([block[0][key] for block in blocks])
+
+    result = {
+        "values": {key: float(np.mean(value)) for key, value in per_query.items()},
+        "per_query": per_query,
+    }
+    if curves:
+        result["curves"] = dict()
+        for key in ("MAP", "P", "Recall"):
+            total = np.zeros(max_depth)
+            for block in blocks:
+                total += block[1][key]
+            result["curves"][key] = total / max(n_queries, 1)
+    return result
+
+
+def get_effectiveness_settings(input_type):
+    """
+    Read the EFFECTIVENESS_* settings of an InputType, so that Python-side
+    evaluation computes the same metrics as the UDLF log.
+
+    Returns:
+        metrics -> list of metrics for evaluate()
+        depths -> list of depths for evaluate()
+    """
+    def param(name):
+        value = input_type.get_param(name)
+        return value[0].strip() if value is not None else ""
+
+    metrics = []
+    depths = set()
+    if param("EFFECTIVENESS_COMPUTE_MAP").upper() == "TRUE":
+        metrics.append("MAP")
+    if param("EFFECTIVENESS_COMPUTE_PRECISIONS").upper() == "TRUE":
+        metrics.append("PRECISION")
+        depths.update(int(k) for k in param("EFFECTIVENESS_PRECISIONS_TO_COMPUTE").split(",") if k.strip())
+    if param("EFFECTIVENESS_COMPUTE_RECALL").upper() == "TRUE":
+        metrics.append("RECALL")
+        depths.update(int(k) for k in param("EFFECTIVENESS_RECALLS_TO_COMPUTE").split(",") if k.strip())
+    return metrics, sorted(depths)
+
+
+MEASURES = {
+    "MAP": compute_map,
+    "PRECISION": compute_precision,
+    "RECALL": compute_recall,
+    "MAP@K": compute_map_at_k,
+    "NDCG": compute_ndcg,
+    "MRR": compute_mrr,
+    "R-PRECISION": compute_r_precision,
+}
+
+
+def compute_measure(rks, classes_list, depth, measure="MAP"):
+    """
+    Compute a measure by name (see MEASURES).
+
+    Returns:
+        mean value and list with the value of each query
+    """
+    measure = measure.upper()
+    if measure not in MEASURES:
+        raise ValueError("Unknown measure {}. Available: {}".format(
+            measure, ", ".join(MEASURES)))
+    return MEASURES[measure](rks, classes_list, depth)
+
+
+def _classes_key(classes_list):
+    if isinstance(classes_list, classIndex.ClassIndex):
+        return ("files", readData._file_key(classes_list.lists_path),
+                readData._file_key(classes_list.classes_path))
+    class_ids = np.ascontiguousarray(get_class_arrays(classes_list)[0])
+    return ("ids", hashlib.sha1(class_ids.tobytes()).hexdigest())
+
+
+def get_baseline_metric(before_path, classes_list, depth=-1, measure="MAP", before_rks=None):
+    """
+    Per-query values of a measure on an input ranked list file, memoized by
+    (path, mtime, size) of the file, the classes, the depth and the measure.
+    Sweeps that compare many outputs against the same input only evaluate
+    the input once; a file changed on disk is evaluated again.
+
+    Parameters:
+        before_path -> path of the input ranked list file
+        classes_list -> class of each element, or a ClassIndex
+        depth -> depth of the measure (-1 for the dataset size)
+        measure -> measure name (see MEASURES)
+        before_rks -> the ranked lists already in memory (read from before_path otherwise)
+
+    Returns:
+        mean value and list with the value of each query
+    """
+    measure = measure.upper()
+    if depth == -1:
+        depth = len(before_rks) if before_rks is not None else len(get_class_arrays(classes_list)[0])
+    key = (readData._file_key(before_path), _classes_key(classes_list), depth, measure)
+
+    with _baseline_lock:
+        if key in _baseline_cache:
+            _baseline_cache.move_to_end(key)
+            return _baseline_cache[key]
+
+    if before_rks is None:
+        before_rks = readData.read_ranked_lists_numpy(
+            before_path, top_k=depth, dataset_size=len(classes_list))
+    value = compute_measure(before_rks, classes_list, depth, measure)
+
+    with _baseline_lock:
+        _baseline_cache[key] = value
+        _baseline_cache.move_to_end(key)
+        while len(_baseline_cache) > BASELINE_CACHE_SIZE:
+            _baseline_cache.popitem(last=False)
+
+    return value
+
+
+def clear_baseline_cache():
+    """
+    Remove all memoized baseline measures.
+    """
+    with _baseline_lock:
+        _baseline_cache.clear()
+
+
+def compute_gain(before_rks, after_rks, classes_list, depth=-1, measure="MAP", verbose=True,
+                 before_path=None):
+    """
+    Per-query gain of a measure between the input (before) and output (after)
+    ranked lists.
+
+    If before_path (the file the input ranked lists come from) is given, the
+    before-side values are memoized (see get_baseline_metric) and before_rks
+    may be None.
+    """
     if depth == -1:
         print("WARNING: depth of the ranked_list size not set, setting to max ranked list size!")
-        depth = len(before_rks)
-    
+        depth = len(before_rks) if before_rks is not None else len(after_rks)
+
     measure = measure.upper()
     if verbose:
         print()
         print("Calculating the gain for {} with depth {}".format(measure, depth))
 
-    before_mean = 0
-    after_mean = 0
-    before_list = []
-    after_list = []
-    gain_list = []
-    class_size_dict = get_class_size_dict(classes_list)
-
-    if measure == "MAP":
-        before_mean, before_list = compute_map(before_rks, classes_list, depth)
-        after_mean, after_list = compute_map(after_rks, classes_list, depth)
-    elif measure == "PRECISION":
-        before_mean, before_list = compute_precision(
-            before_rks, classes_list, depth)
-        after_mean, after_list = compute_precision(
-            after_rks, classes_list, depth)
-    elif measure == "RECALL":
-        before_mean, before_list = compute_recall(
-            before_rks, classes_list, depth)
-        after_mean, after_list = compute_recall(after_rks, classes_list, depth)
-
-    #gain_mean = round(after_mean - before_mean, 4)
-    # print("aqui")
-    #print(before_mean, after_mean)
-    #gain_mean_percent = round((((after_mean-before_mean))/before_mean)*100, 4)
-    #gain_mean_percent = (((after_mean-before_mean))/before_mean)*100
-    # print(gain_mean_percent)
+    if before_path is not None:
+        before_mean, before_list = get_baseline_metric(
+            before_path, classes_list, depth, measure, before_rks)
+    else:
+        before_mean, before_list = compute_measure(before_rks, classes_list, depth, measure)
+    after_mean, after_list = compute_measure(after_rks, classes_list, depth, measure)
 
+    gain_list = []
     for i in range(len(after_list)):
         gain_list.append((round(after_list[i]-before_list[i], 4), i))
 
-    return gain_list  # , gain_mean_percent, gain_mean
+    return gain_list
@@ -0,0 +1,157 @@
+"""
+Named-pipe (FIFO) streaming of ranked lists to and from the UDLF binary.
+
+Instead of writing in-memory ranked lists to disk and letting the binary
+read them back, the binary is given POSIX FIFOs: a writer thread formats
+the rows into the input FIFO as the binary consumes them, and a reader
+thread parses the output rows as the binary produces them.
+
+A FIFO can only be read once, front to back. Configurations where the
+binary has to look at a file more than once (input format detection with
+INPUT_FILE_FORMAT = AUTO, matrix inputs) must use regular files; see
+needs_seek. If the binary reopens an input anyway, the open fails instead
+of blocking (see FifoWriter).
+"""
+
+import errno
+import os
+import threading
+import logging
+import numpy as np
+from pyUDLF.utils import readData, writeData
+
+logger = logging.getLogger(__name__)
+
+FIFO_BUFFER_SIZE = 1 << 20
+
+
+def fifo_supported() -> bool:
+    """
+    Check whether named pipes are available (POSIX only).
+    """
+    return hasattr(os, "mkfifo")
+
+
+def needs_seek(parameters: dict) -> bool:
+    """
+    Check whether a configuration makes the binary read its input files
+    more than once (so they cannot be FIFOs).
+
+    Args:
+        parameters (dict): Config parameters (as in configGenerator).
+
+    Returns:
+        bool: True if regular files are required.
+    """
+    def param(name):
+        value = parameters.get(name)
+        return value[0].strip().upper() if value else ""
+
+    return param("INPUT_FILE_FORMAT") != "RK"
+
+
+def _release(path, flags):
+    # open the other end without blocking, so a thread blocked in open() returns
+    try:
+        fd = os.open(path, flags | os.O_NONBLOCK)
+    except OSError as e:
+        if e.errno not in (errno.ENXIO, errno.ENOENT):
+            raise
+        return
+    os.close(fd)
+
+
+class FifoWriter(threading.Thread):
+    """
+    Thread that creates a FIFO and streams ranked lists into it.
+
+    Attributes:
+        path -> FIFO path
+        error -> exception raised while writing, or None
+    """
+
+    def __init__(self, path, data, chunk_rows=1024):
+        super().__init__(daemon=True)
+        self.path = path
+        self.data = data
+        self.chunk_rows = chunk_rows
+        self.error = None
+        os.mkfifo(path)
+
+    def run(self):
+        try:
+            # blocks until the binary opens the FIFO for reading
+            with open(self.path, "w", buffering=FIFO_BUFFER_SIZE) as f:
+                # the open pipe keeps working; a second open of the input by
+                # the binary now fails at once instead of waiting for a writer
+                os.unlink(self.path)
+                for start in range(0, len(self.data), self.chunk_rows):
+                    f.write(writeData._format_rows(self.data[start:start + self.chunk_rows]))
+        except Exception as e:
+            self.error = e
+
+    def release(self, timeout=5.0):
+        """
+        Stop waiting for a reader that will never come (e.g. the binary
+        failed before opening its input) and join the thread.
+        """
+        while self.is_alive():
+            _release(self.path, os.O_RDONLY)
+            self.join(0.01)
+            timeout -= 0.01
+            if timeout <= 0:
+                break
+
+
+class FifoReader(threading.Thread):
+    """
+    Thread that creates a FIFO and parses the rows written into it.
+
+    Attributes:
+        path -> FIFO path
+        data -> 2-D array with the rows read (after join)
+        error -> exception raised while reading, or None
+    """
+
+    def __init__(self, path, dtype=np.int32, chunk_rows=1024):
+        super().__init__(daemon=True)
+        self.path = path
+        self.dtype = dtype
+        self.chunk_rows = chunk_rows
+        self.data = None
+        self.error = None
+        self._blocks = []
+        self._finished = threading.Event()
+        os.mkfifo(path)
+
+    def run(self):
+        try:
+            # the binary may open the output more than once; keep reading
+            # until the run is over
+            while not self._finished.is_set():
+                with open(self.path, "r", buffering=FIFO_BUFFER_SIZE) as f:
+                    while True:
+                        block = readData._load_block(f, self.chunk_rows, self.dtype)
+                        if block.shape[0] == 0:
+                            break
+                        self._blocks.append(block)
+        except Exception as e:
+            self.error = e
+
+        if self._blocks:
+            self.data = np.concatenate(self._blocks)
+        else:
+            self.data = np.empty((0, 0), dtype=self.dtype)
+
+    def release(self, timeout=5.0):
+        """
+        Signal the end of the run and join the thread.
+        """
+        self._finished.set()
+        while self.is_alive():
+            _release(self.path, os.O_WRONLY)
+            self.join(0.01)
+            timeout -= 0.01
+            if timeout <= 0:
+                logger.warning(f"FIFO reader of {self.path} did not finish")
+                break
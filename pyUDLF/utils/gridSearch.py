@@ -1,4 +1,15 @@
 from pyUDLF import run_calls
+from pyUDLF.utils import significance
+
+
+def sort_results(results):
+    """
+    Sort (value, label) pairs from best to worst.
+    Failed runs ("NONE" values) go to the end.
+    """
+    return sorted(results,
+                  key=lambda x: (x[0] != "NONE", x[0] if x[0] != "NONE" else 0, x[1]),
+                  reverse=True)
 
 
 def find_best_param(input_type, method, param_value, list_values, ranked_list_size=0, verbose=False):
@@ -152,20 +163,20 @@ def find_best_param(input_type, method, param_value, list_values, ranked_list_si
                 if(r_values):
                     for param in recall_param:
                         rv = output_values[param]['After']
-                        best_dict[param].append((float(rv), value))
+                        best_dict[param].append((rv, value))
                         # pegar o recall
 
                         # adicionar chaves precision
                 if(p_values):
                     for param in precision_param:
                         pv = output_values[param]['After']
-                        best_dict[param].append((float(pv), value))
+                        best_dict[param].append((pv, value))
 
                     # adicionar chave map
                 if(map_values):
                     # print(output_values['MAP']['After'])
                     mv = output_values['MAP']['After']
-                    best_dict['MAP'].append((float(mv), value))
+                    best_dict['MAP'].append((mv, value))
 
     # voltar o valor original
         # setar o novo metodo
@@ -177,8 +188,7 @@ def find_best_param(input_type, method, param_value, list_values, ranked_list_si
             method.upper()), old_ranked_list_size)
 
     for param in best_dict:
-        best_dict[param] = sorted(best_dict[param], reverse=True)
-        # sorted(l, key=lambda x: 0 if x[0] is None else x[0])
+        best_dict[param] = sort_results(best_dict[param])
 
 
 # ------------------------------------------------------------
@@ -316,7 +326,7 @@ def find_best_method(input_type, ranked_list_size=0, verbose=True):
         # best_dict['MAP'] = sorted(best_dict['MAP'], reverse=True)
 
     for param in best_dict:
-        best_dict[param] = sorted(best_dict[param], reverse=True)
+        best_dict[param] = sort_results(best_dict[param])
 
     # print(best_dict['MAP'])
     # print(best_dict['Recall@4'])
@@ -443,3 +453,25 @@ def find_best_method_with_best_k(input_type, measures=[], k_interval=[], ranked_
 
     # print(best_dict)
     return best_dict
+
+
+def rank_candidates(before, candidates, alpha=0.05, n_resamples=10000, seed=0):
+    """
+    Rank candidate configurations by their gain over the same input, keeping
+    only what is statistically supported at the top.
+
+    before -> per-query values of the input (e.g. compute_map(...)[1])
+    candidates -> dictionary label -> per-query values of each output
+    returns -> list of (summary, label), significant gains first, then by
+               mean gain; summary is the dictionary of significance.compare
+    """
+    results = []
+    for label, after in candidates.items():
+        summary = significance.compare(before, after, n_resamples=n_resamples,
+                                       alpha=alpha, seed=seed)
+        results.append((summary, label))
+
+    return sorted(results,
+                  key=lambda x: (x[0]["significant"] and x[0]["mean_gain"] > 0,
+                                 x[0]["mean_gain"]),
+                  reverse=True)
@@ -1,5 +1,6 @@
 import os
-from pyUDLF.utils import configGenerator
+import numpy as np
+from pyUDLF.utils import configGenerator, scratch
 from pyUDLF import run_calls
 
 
@@ -9,19 +10,32 @@ from pyUDLF import run_calls
 # config_path = "/home/gustavo/Desktop/UDLF/UDLF/bin/config.ini"
 
 
+def _as_ranked_lists(value):
+    # a 2-D array is a single ranked list, a 3-D array one per fusion input
+    if isinstance(value, np.ndarray):
+        return [value] if value.ndim == 2 else list(value)
+    return value
+
+
 class InputType:
     """
     Class to handle the inputs
     """
 
-    def __init__(self, config_path=None, input_files=None):
+    def __init__(self, config_path=None, input_files=None, stream_inputs=False):
         """
         Initial class parameters.
+
+        stream_inputs -> keep in-memory ranked lists in memory until the config
+                         is written, so run_calls.run_streaming can send them
+                         to the binary through FIFOs without touching the disk
         """
         self.parameters = dict()
         self.list_parameters = []
         self.input_files_list = input_files
         self.config_path = config_path
+        self.stream_inputs = stream_inputs
+        self.pending_inputs = False
 
         if self.config_path is None:
             self.config_path = run_calls.config_path
@@ -48,6 +62,7 @@ class InputType:
             path, self.parameters, self.list_parameters)
         if self.parameters is None:
             return None
+        return self.parameters
 
     def init_data(self):
         data_paths = []
@@ -59,17 +74,42 @@ class InputType:
             # vai escrever o path e colocar auto no format
             self.set_input_files(self.input_files_list)
 
-        if isinstance(self.input_files_list, list):
+        # list de list ou array -> ou seja, precisa escrever
+        if configGenerator.is_in_memory(self.input_files_list):
+            self.input_files_list = _as_ranked_lists(self.input_files_list)
+            if self.stream_inputs:
+                # escrito apenas quando necessario (write_pending_inputs)
+                self.pending_inputs = True
+            else:
+                data_paths = configGenerator.write_input_files(
+                    self.input_files_list, self.get_input_scratch_dir())
+                self.set_input_files(data_paths)
+
+        elif isinstance(self.input_files_list, list):
             # list de strs, ou seja, lista de paths
             if isinstance(self.input_files_list[0], str):
                 self.set_input_files(self.input_files_list)
 
-            # list de list -> ou seja, precisa escrever
-            if isinstance(self.input_files_list[0], list):
-                aux = os.path.dirname(self.config_path)
-                data_paths = configGenerator.write_input_files(
-                    self.input_files_list, aux)
-                self.set_input_files(data_paths)
+    def write_pending_inputs(self):
+        """
+        Write in-memory ranked lists kept by stream_inputs to files
+        """
+        if self.pending_inputs:
+            self.pending_inputs = False
+            data_paths = configGenerator.write_input_files(
+                self.input_files_list, self.get_input_scratch_dir())
+            self.set_input_files(data_paths)
+
+    def get_input_scratch_dir(self):
+        """
+        Scratch directory for the generated rks_N input files, kept (and
+        removed) with this object; see scratch.ScratchDir
+        """
+        expected_bytes = 8 * sum(len(rks) * len(rks[0]) for rks in self.input_files_list
+                                 if len(rks))
+        self.input_scratch = scratch.ScratchDir(prefix="pyudlf_inputs_",
+                                                expected_bytes=expected_bytes)
+        return self.input_scratch.path
 
     def set_method_name(self, value):
         """
@@ -144,13 +184,13 @@ class InputType:
         """
         """
         self.input_files_list = value
-        if isinstance(self.input_files_list, list):
-            if isinstance(self.input_files_list[0], list):
-                aux = os.path.dirname(self.config_path)
-                data_paths = configGenerator.write_input_files(
-                    self.input_files_list, aux)
-                self.set_input_files(data_paths)
-                return
+        if configGenerator.is_in_memory(self.input_files_list):
+            self.input_files_list = _as_ranked_lists(self.input_files_list)
+            self.pending_inputs = False
+            data_paths = configGenerator.write_input_files(
+                self.input_files_list, self.get_input_scratch_dir())
+            self.set_input_files(data_paths)
+            return
         configGenerator.set_input(value, self.parameters, self.list_parameters)
 
     def set_ranked_lists_size(self, value):
@@ -242,6 +282,7 @@ class InputType:
         Parameters:
             path -> path with the name of the new config
         """
+        self.write_pending_inputs()
         configGenerator.writeConfig(
             self.parameters, self.list_parameters, path)
 
@@ -1,5 +1,5 @@
 from turtle import shape
-from pyUDLF.utils import readData
+from pyUDLF.utils import readData, binaryData, classIndex
 from PIL import Image, ImageDraw
 import numpy as np
 import os
@@ -25,44 +25,145 @@ class OutputType:
         self.images_path = nome
         self.list_path = nome
         self.classes_path = nome
+        # outputs received in memory (run_calls.run_streaming)
+        self.rks_data = None
+        self.matrix_data = None
 
-    def get_matrix(self):
+    def get_matrix(self, mmap=False, dtype=np.float32, rows=None):
         """
         Read matrix file
 
         Parameters:
             matrix_path -> matrix path
+            mmap -> if True, return a np.memmap view over a binary sidecar
+            dtype -> dtype of the returned matrix (default float32)
+            rows -> slice or range of rows to load (default all rows)
 
         Return:
-            returns a matrix
+            returns a matrix (numpy array)
         """
+        if self.matrix_data is not None:
+            matrix = self.matrix_data if rows is None else self.matrix_data[rows]
+            return matrix.astype(dtype, copy=False)
+
         if self.matrix_path is None:
             print("The shape of the output is not matrix!")
             return None
 
-        matrix = readData.read_matrix_file(self.matrix_path)
+        if mmap:
+            matrix = self.__internal_binary_use__(self.matrix_path, binaryData.MATRIX_DTYPE)
+            if rows is not None:
+                if isinstance(rows, range):
+                    rows = slice(rows.start, rows.stop, rows.step)
+                matrix = matrix[rows]
+            return matrix
+
+        matrix = readData.read_matrix_numpy(self.matrix_path, dtype=dtype, rows=rows)
         return matrix
 
-    def get_rks(self, top_k=1000):
+    def get_rks(self, top_k=1000, mmap=False, as_names=False, rows=None):
         """
         Read string ou numeric ranked list
 
         Parameters:
             rk_patk -> ranked list path
+            mmap -> if True, return a np.memmap view over a binary sidecar
+                    (numeric ranked lists only)
+            as_names -> for string ranked lists, return the names instead of
+                        ids encoded with the lists file vocabulary
+            rows -> slice, range or index array of queries to read
+                    (default all rows)
 
         Return:
-            returns a ranked list with image numbers or names
+            returns a ranked list with image numbers (numpy array) or names
         """
+        if self.rks_data is not None:
+            rks = self.rks_data if rows is None else self.rks_data[rows]
+            return rks if top_k == -1 else rks[:, :top_k]
+
         if self.rk_path is None:
             print("The shape of the output is not RK!")
             return None
 
-        rks = readData.read_ranked_lists_file_string(self.rk_path, top_k=top_k)
-        try:
-            rks = [[int(elem) for elem in rk] for rk in rks]
-        finally:
+        if mmap:
+            rks = self.__internal_binary_use__(self.rk_path, binaryData.RK_DTYPE)
+            if rows is not None:
+                if isinstance(rows, range):
+                    rows = slice(rows.start, rows.stop, rows.step)
+                rks = rks[rows]
+            if top_k != -1:
+                rks = rks[:, :top_k]
             return rks
 
+        if readData.is_numeric_ranked_list(self.rk_path):
+            dataset_size = None
+            if self.list_path and os.path.isfile(self.list_path):
+                dataset_size = len(classIndex.get_vocabulary(self.list_path))
+            return readData.read_ranked_lists_numpy(
+                self.rk_path, top_k=top_k, rows=rows, dataset_size=dataset_size)
+
+        if self.list_path is not None and not as_names:
+            return readData.read_ranked_lists_encoded(
+                self.rk_path, self.list_path, top_k=top_k, rows=rows)
+        return readData.read_ranked_lists_file_string(self.rk_path, top_k=top_k, rows=rows)
+
+    def get_rk_row(self, line, top_k=-1):
+        """
+        Read a single ranked list (one query) by seeking to its line
+
+        Parameters:
+            line -> query (line) number
+            top_k -> ranked list size (default -1, entire list)
+
+        Return:
+            returns a 1-D array with image numbers
+        """
+        rows = self.get_rk_rows([line], top_k=top_k)
+        if rows is None:
+            return None
+        return rows[0]
+
+    def get_rk_rows(self, lines, top_k=-1):
+        """
+        Read selected ranked lists using the persisted line-offset index
+        of the output, without reading the whole file
+
+        Parameters:
+            lines -> query (line) numbers
+            top_k -> ranked list size (default -1, entire list)
+
+        Return:
+            returns a 2-D array with image numbers
+        """
+        if self.rk_path is None:
+            print("The shape of the output is not RK!")
+            return None
+
+        return readData.read_ranked_lists_rows(
+            self.rk_path, lines, top_k=top_k, lists_path=self.list_path)
+
+    def get_rk_names(self, rks):
+        """
+        Convert ranked lists of image ids back to image names (vectorized)
+
+        Parameters:
+            rks -> array of ids, as returned by get_rks
+
+        Return:
+            returns an array with the image names
+        """
+        if self.list_path is None:
+            print("Lists file path is unknown! Unable to convert ids to names.")
+            return None
+
+        return classIndex.get_vocabulary(self.list_path).decode(rks)
+
+    def __internal_binary_use__(self, path, dtype):
+        if binaryData.is_binary_file(path):
+            return binaryData.read_binary(path, mmap=True)
+        bin_path = binaryData.get_binary_sidecar(path, dtype=dtype)
+        return binaryData.read_binary(bin_path, mmap=True)
+
     def get_log(self):
         """
         Returns the result of the execution !
@@ -116,25 +217,20 @@ class OutputType:
             print("Something is wrong. Unable to generate preview!")
             return
         ###############
-        classes_list = readData.read_classes(
+        class_index = classIndex.get_class_index(
             self.list_path, self.classes_path)
+        classes_list = class_index.class_ids
         # print(classes_list)
 
         if self.images_path is None:
             print("Unable to generate preview, image path is empty!")
             return
 
-        f = open(self.rk_path)
-        all_lines = f.readlines()
-        f.close()
-
-        f = open(self.list_path)
-        list_test = [x.replace('\n', '') for x in f.readlines()]
-        f.close()
+        list_test = class_index.names
         # print(list_test)
 
         # rk line for show
-        only_one = all_lines[line].split()
+        only_one = self.get_rk_row(line, top_k=start_element + rk_size)
         # print(only_one)
         # print(classes_list[int(only_one[1])])
         # taking images class
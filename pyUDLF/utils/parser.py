@@ -13,6 +13,7 @@ logger = logging.getLogger(__name__)
 def parse_config(config_file: str) -> dict:
     """
     Parse a UDLF configuration file into a dictionary of parameters.
+    The file is read through the shared config cache (readData.load_config).
 
     Args:
         config_file (str): Path to the configuration file.
@@ -35,47 +36,26 @@ def parse_config(config_file: str) -> dict:
         "matrix_path": "",
         "log_path": ""
     }
-    with open(config_file, "r") as f:
-        lines = [line.strip() for line in f if line.strip()]
-
-    for line in lines:
-        if line.startswith("UDL_TASK"):
-            params["task"] = line.split("=")[1].split("#")[0].strip()
-
-        elif line.startswith("INPUT_FILE "):  # explicit INPUT_FILE
-            params["before_path"] = line.split("=")[1].split("#")[0].strip()
-
-        elif line.startswith("INPUT_FILE_LIST"):
-            params["list_path"] = line.split("=")[1].split("#")[0].strip()
-
-        elif line.startswith("INPUT_FILE_CLASSES"):
-            params["classes_path"] = line.split("=")[1].split("#")[0].strip()
-
-        elif line.startswith("INPUT_FILE_FORMAT"):
-            params["in_file_format"] = line.split("=")[1].split("#")[0].strip()
-
-        elif line.startswith("INPUT_RK_FORMAT"):
-            params["in_rk_format"] = line.split("=")[1].split("#")[0].strip()
-
-        elif line.startswith("OUTPUT_FILE "):  # explicit OUTPUT_FILE
-            params["out_file"] = line.split("=")[1].split("#")[0].strip()
-
-        elif line.startswith("OUTPUT_FILE_FORMAT"):
-            params["out_file_format"] = line.split("=")[1].split("#")[0].strip()
-
-        elif line.startswith("OUTPUT_RK_FORMAT"):
-            params["out_rk_format"] = line.split("=")[1].split("#")[0].strip()
-
-        elif line.startswith("OUTPUT_FILE_PATH"):
-            base = line.split("=")[1].split("#")[0].strip()
-            if params["out_file_format"] == "RK":
-                params["rk_path"] = f"{base}.txt"
-            elif params["out_file_format"] == "MATRIX":
-                params["matrix_path"] = f"{base}.txt"
-            params["after_path"] = f"{base}.txt"  # useful for before/after comparison
-
-        elif line.startswith("OUTPUT_LOG_FILE_PATH"):
-            params["log_path"] = line.split("=")[1].split("#")[0].strip()
+    config = readData.load_config(config_file)
+
+    params["task"] = config.get("UDL_TASK")
+    params["before_path"] = config.get("INPUT_FILE")
+    params["list_path"] = config.get("INPUT_FILE_LIST")
+    params["classes_path"] = config.get("INPUT_FILE_CLASSES")
+    params["in_file_format"] = config.get("INPUT_FILE_FORMAT")
+    params["in_rk_format"] = config.get("INPUT_RK_FORMAT")
+    params["out_file"] = config.get("OUTPUT_FILE")
+    params["out_file_format"] = config.get("OUTPUT_FILE_FORMAT")
+    params["out_rk_format"] = config.get("OUTPUT_RK_FORMAT")
+    params["log_path"] = config.get("OUTPUT_LOG_FILE_PATH")
+
+    if "OUTPUT_FILE_PATH" in config:
+        base = config.get("OUTPUT_FILE_PATH")
+        if params["out_file_format"] == "RK":
+            params["rk_path"] = f"{base}.txt"
+        elif params["out_file_format"] == "MATRIX":
+            params["matrix_path"] = f"{base}.txt"
+        params["after_path"] = f"{base}.txt"  # useful for before/after comparison
 
     return params
     
@@ -1,3 +1,135 @@
+import os
+import re
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from pyUDLF.utils import compression, classIndex, scratch
+
+# target size of the byte ranges parsed by each worker task
+PARALLEL_RANGE_BYTES = 32 << 20
+
+
+class ConfigModel:
+    """
+    Ordered, typed view of a UDLF config file.
+
+    The file is parsed once; readData.read_config and parser.parse_config
+    are both built on top of it. Instances are shared through the config
+    cache and must not be modified.
+    """
+
+    def __init__(self, lines):
+        """
+        Parse the config lines.
+        """
+        self.list_parameters = []
+        self.raw = dict()
+
+        for line in lines:
+            line = line.strip().split('=')
+            if len(line) >= 2:
+                param = line[0].strip()
+                # value and comments, as stored by configGenerator
+                self.raw[param] = line[1].split('#')
+                if param not in self.list_parameters:
+                    self.list_parameters.append(param)
+
+    def __contains__(self, param):
+        return param in self.raw
+
+    def get(self, param, default=""):
+        """
+        Return the value of a parameter as a stripped string.
+        """
+        if param not in self.raw:
+            return default
+        return self.raw[param][0].strip()
+
+    def get_typed(self, param, default=None):
+        """
+        Return the value of a parameter converted to bool (TRUE/FALSE),
+        int or float when possible, otherwise as a string.
+        """
+        if param not in self.raw:
+            return default
+        value = self.get(param)
+        if value.upper() in ("TRUE", "FALSE"):
+            return value.upper() == "TRUE"
+        for cast in (int, float):
+            try:
+                return cast(value)
+            except ValueError:
+                pass
+        return value
+
+    def to_parameters(self):
+        """
+        Return independent copies of the parameters dictionary and list,
+        in the format used by configGenerator.
+        """
+        parameters = {param: list(value) for param, value in self.raw.items()}
+        return parameters, list(self.list_parameters)
+
+
+# maximum number of parsed configs kept in memory
+CONFIG_CACHE_SIZE = 32
+
+_config_cache = OrderedDict()
+_config_cache_lock = threading.Lock()
+
+
+def _file_key(path):
+    # identity of a file's contents for the in-memory caches
+    # (config, class index, vocabulary and baseline caches)
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _store_config(key, model):
+    with _config_cache_lock:
+        _config_cache[key] = model
+        _config_cache.move_to_end(key)
+        while len(_config_cache) > CONFIG_CACHE_SIZE:
+            _config_cache.popitem(last=False)
+
+
+def load_config(path):
+    """
+    Return the ConfigModel of a config file.
+    Models are cached by (path, mtime, size), so a config is parsed only
+    once until it changes on disk.
+
+    Parameters:
+        path -> config path to read
+
+    Returns:
+        ConfigModel
+    """
+    key = _file_key(path)
+    with _config_cache_lock:
+        if key in _config_cache:
+            _config_cache.move_to_end(key)
+            return _config_cache[key]
+
+    with compression.open_file(path, 'r') as f:
+        model = ConfigModel(f)
+    _store_config(key, model)
+    return model
+
+
+def cache_config_text(path, lines):
+    """
+    Register the model of a config just written from memory,
+    so the following reads of that file do not parse it again.
+
+    Parameters:
+        path -> path of the written config
+        lines -> lines written to the file
+    """
+    _store_config(_file_key(path), ConfigModel(lines))
+
 
 def read_config(path):
     """
@@ -10,96 +142,134 @@ def read_config(path):
         parameters -> dictionary with parameters and values
         list_parameters -> list with parameters
     """
-    parameters = dict()
-    list_parameters = []
+    return load_config(path).to_parameters()
 
-    with open(path, 'r') as f:
-        lines = [x.strip() for x in f.readlines()]
-        lines = [x.split('=') for x in lines]
 
-    for line in lines:
-        if len(line) >= 2:
-            param = line[0].strip()
-            # value = line[1].split('#')[0]  # pega sem os comentarios
-            value = line[1].split('#')     # teste para pegar os comentarios
-            parameters[param] = value
-            list_parameters.append(param)
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_TASK_RE = re.compile(r"\bTask\s*:\s*([A-Za-z_]+)")
+_TIME_RE = re.compile(r"\bTime\s*:\s*({})".format(_NUMBER))
+_SECTION_RE = re.compile(r"^\W*(Before|After|Relative\s+Gains?|Gains?|Effectiveness)\b",
+                         re.IGNORECASE)
+_METRIC_RE = re.compile(r"^\W*([A-Za-z][\w@]*)\s*[:=]?\s+({})\s*%?\s*$".format(_NUMBER))
 
-    return parameters, list_parameters
 
+class LogParser:
+    """
+    Single-pass parser of UDLF logs.
 
-def read_log(path):
+    Lines (or arbitrary text chunks) are fed as they are produced, so a log
+    can be parsed while the binary is still writing it. Metrics are typed:
+    UDL logs give {metric: {"Before": float, "After": float, "Gain": float}},
+    FUSION logs give {metric: float}. "Time" is a float and "Task" a string.
     """
-    Read config results and return
+
+    def __init__(self):
+        self.log_parameters = dict()
+        self.task = "NONE"
+        self._section = None
+        self._partial = ""
+
+    def feed(self, data):
+        """
+        Feed a chunk of log text; incomplete trailing lines are buffered.
+        """
+        data = self._partial + data
+        lines = data.split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self.feed_line(line)
+
+    def close(self):
+        """
+        Flush the buffered partial line and return the parsed values.
+        """
+        if self._partial:
+            self.feed_line(self._partial)
+            self._partial = ""
+        return self.log_parameters
+
+    def feed_line(self, line):
+        """
+        Parse one complete log line.
+        """
+        line = line.strip()
+        if not line:
+            return
+
+        match = _TASK_RE.search(line)
+        if match:
+            self.task = match.group(1).upper()
+            self.log_parameters["Task"] = self.task
+            return
+
+        match = _TIME_RE.search(line)
+        if match:
+            self.log_parameters["Time"] = float(match.group(1))
+            return
+
+        match = _SECTION_RE.match(line)
+        if match:
+            name = match.group(1).lower()
+            if name.startswith("before"):
+                self._section = "Before"
+            elif name.startswith("after"):
+                self._section = "After"
+            elif name.startswith("effectiveness"):
+                self._section = "Effectiveness" if self.task == "FUSION" else None
+            else:
+                self._section = "Gain"
+            return
+
+        if self._section is None:
+            return
+
+        match = _METRIC_RE.match(line)
+        if match is None:
+            # anything else (separators, other fields) closes the table
+            if self._section in ("Gain", "Effectiveness"):
+                self._section = None
+            return
+
+        metric, value = match.group(1), float(match.group(2))
+        if self._section == "Effectiveness":
+            self.log_parameters[metric] = value
+        else:
+            entry = self.log_parameters.get(metric)
+            if not isinstance(entry, dict):
+                entry = dict()
+                self.log_parameters[metric] = entry
+            entry[self._section] = value
+
+
+def parse_log_stream(stream):
+    """
+    Parse a UDLF log from any iterable of lines or text chunks
+    (file object, subprocess pipe, ...).
 
     Parameters:
-        path -> log path to read, same as config path
+        stream -> iterable yielding str
 
     Returns:
-        log_parameters -> dictionary with results
+        log_parameters -> dictionary with typed results
     """
-    log_parameters = dict()
-    before = []
-    after = []
-    gains = []
-    parametros = []
-    metodo = "NONE"
-
-    with open(path, 'r') as f:
-        lines = [x.strip() for x in f.readlines()]
+    log_parser = LogParser()
+    for chunk in stream:
+        log_parser.feed(chunk)
+    return log_parser.close()
 
-        for i in range(len(lines)):
-            if "Task" in lines[i]:
-                line = lines[i].split(':')
-                metodo = line[1].strip()
 
-            if "Time" in lines[i]:
-                line = lines[i].split(':')
-                log_parameters["Time"] = line[1]
+def read_log(path):
+    """
+    Read config results and return
 
-            if metodo == "FUSION":
-                if "Effectiveness" in lines[i]:
-                    i = i + 1
-                    while("-" not in lines[i]):
-                        line = lines[i].split()
-                        parametros.append(line[0])
-                        before.append(line[1])
-                        i = i + 1
-                    j = 0
-                    for j in range(len(parametros)):
-                        log_parameters[parametros[j]] = before[j]
+    Parameters:
+        path -> log path to read, same as config path
 
-            else:
-                if "Before" in lines[i]:
-                    i = i + 1
-                    while ("After" not in lines[i]):
-                        line = lines[i].split()
-                        parametros.append(line[0])
-                        before.append(line[1])
-                        # log_parameters[line[0]] = line[1]
-                        i = i + 1
-
-                    i = i + 1
-                    while ("Relative Gains" not in lines[i]):
-                        line = lines[i].split()
-                        after.append(line[1])
-                        i = i + 1
-
-                    i = i + 1
-                    j = 0
-                    while (j < len(parametros)):
-                        line = lines[i].split()
-                        gains.append(line[1])
-                        i = i + 1
-                        j = j + 1
-
-                    j = 0
-                    for j in range(len(parametros)):
-                        log_parameters[parametros[j]] = dict(
-                            [("Before", before[j]),
-                             ("After", after[j]),
-                             ("Gain", gains[j])])
-    return log_parameters
+    Returns:
+        log_parameters -> dictionary with typed results
+    """
+    with compression.open_file(path, 'r') as f:
+        return parse_log_stream(f)
 
 
 def read_ranked_lists_file_numeric(file_path, top_k=-1):
@@ -115,13 +285,15 @@ def read_ranked_lists_file_numeric(file_path, top_k=-1):
     """
     print("\n\tReading file...", file_path)
     
-    with open(file_path, "r") as f:
-        ranked_list = [line.strip().split(" ") for line in f]
+    # bounded split: the tokens beyond top_k are never split nor converted
+    with compression.open_file(file_path, "r") as f:
+        if top_k != -1:
+            ranked_list = [line.strip().split(" ", top_k)[:top_k] for line in f]
+        else:
+            ranked_list = [line.strip().split(" ") for line in f]
 
     for i, elements in enumerate(ranked_list):
         ranked_list[i] = [int(y) for y in elements]
-        if top_k != -1:
-            ranked_list[i] = ranked_list[i][:top_k]
 
     if top_k != -1:
         print("\n\t** Returned ranked list size (limited to top_k):", len(ranked_list[0]))
@@ -131,26 +303,183 @@ def read_ranked_lists_file_numeric(file_path, top_k=-1):
     return ranked_list
 
 
-def read_ranked_lists_file_string(file_path, top_k=-1):
+def is_numeric_ranked_list(file_path):
+    """
+    Check whether a ranked list file holds image numbers (NUM format) or
+    image names (STR format), from the first token of the file.
+
+    Parameters:
+        file_path (str): Path to the ranked list file.
+
+    Returns:
+        bool: True for numeric ranked lists (and empty files).
+    """
+    with compression.open_file(file_path, "r") as f:
+        for line in f:
+            tokens = line.split(None, 1)
+            if tokens:
+                return tokens[0].isdigit()
+    return True
+
+
+def get_rk_dtype(dataset_size):
+    """
+    Choose the smallest integer dtype able to store the image ids of a dataset.
+
+    Parameters:
+        dataset_size (int): Number of images in the dataset (None if unknown).
+
+    Returns:
+        numpy.dtype: uint16 for datasets up to 65536 images, int32 otherwise
+                     or when the dataset size is unknown.
+    """
+    if dataset_size is not None and dataset_size <= np.iinfo(np.uint16).max + 1:
+        return np.dtype(np.uint16)
+    return np.dtype(np.int32)
+
+
+def _resolve_rows(rows, n_rows):
+    """
+    Normalize a row selection.
+
+    Returns:
+        (start, stop, step) for None, slices and ranges,
+        or an int64 index array for any other sequence.
+    """
+    if rows is None:
+        rows = slice(None)
+    if isinstance(rows, range):
+        rows = slice(rows.start, rows.stop, rows.step)
+    if isinstance(rows, slice):
+        start, stop, step = rows.indices(n_rows)
+        if step < 1:
+            raise ValueError("rows must have a positive step.")
+        return start, stop, step
+
+    indices = np.asarray(rows, dtype=np.int64).ravel()
+    indices = np.where(indices < 0, indices + n_rows, indices)
+    return indices
+
+
+def read_ranked_lists_numpy(file_path, top_k=-1, dtype=None, workers=1,
+                            rows=None, dataset_size=None):
+    """
+    Read a numeric ranked list into a contiguous 2-D integer array.
+
+    Each line is split at most top_k times, so the columns beyond top_k are
+    never converted, and only the selected rows are tokenized.
+
+    Parameters:
+        file_path (str): Path to the numeric ranked list file.
+        top_k (int): Ranked list size (default is -1, meaning the entire list).
+        dtype: Output dtype (default is None, chosen from dataset_size).
+        workers (int): Number of parsing processes (default is 1, serial;
+                       None uses all CPUs). Only used when reading all rows
+                       of a plain (uncompressed) file.
+        rows (slice, range or index array): Rows (queries) to read
+                       (default is None, all rows). Index arrays are read
+                       by random access through the line-offset index.
+        dataset_size (int): Number of images in the dataset, e.g. the size
+                       of the lists file (default is None, unknown). The
+                       row count of the file is not used: a file with a
+                       subset of the queries may still rank any image.
+
+    Returns:
+        numpy.ndarray: Array of shape (n_selected_rows, top_k) with image numbers.
+    """
+    print("\n\tReading file...", file_path)
+
+    if (rows is None and (workers is None or workers > 1)
+            and not compression.is_compressed(file_path)):
+        ranked_list = _parallel_parse(file_path, "rk", top_k,
+                                      dtype or get_rk_dtype(dataset_size), workers)
+    else:
+        ranked_list = _read_rk_rows_serial(file_path, top_k,
+                                           dtype or get_rk_dtype(dataset_size), rows)
+    n_cols = ranked_list.shape[1]
+
+    if top_k != -1:
+        print("\n\t** Returned ranked list size (limited to top_k):", n_cols)
+    else:
+        print("\n\t** Returned all the ranked list with size:", n_cols)
+
+    return ranked_list
+
+
+def _read_rk_rows_serial(file_path, top_k, dtype, rows, lists_path=None):
+    # rows are streamed into a preallocated array; with lists_path, names
+    # are encoded with the lists file vocabulary
+    n_rows = count_lines(file_path)
+    selection = _resolve_rows(rows, n_rows)
+    if isinstance(selection, np.ndarray):
+        if len(selection) == 0:
+            return np.empty((0, 0), dtype=dtype)
+        return read_ranked_lists_rows(file_path, selection, top_k=top_k, dtype=dtype,
+                                      lists_path=lists_path)
+
+    lookup = None
+    if lists_path is not None:
+        lookup = classIndex.get_vocabulary(lists_path).name_to_id.__getitem__
+
+    start, stop, step = selection
+    ranked_list = None
+    filled = 0
+    n_cols = top_k
+    with compression.open_file(file_path, "r") as f:
+        for i, line in enumerate(f):
+            if i >= stop:
+                break
+            if i < start or (i - start) % step or not line.strip():
+                continue
+            if ranked_list is None:
+                if n_cols == -1:
+                    n_cols = len(line.split())
+                else:
+                    n_cols = len(line.split(None, n_cols)[:n_cols])
+                ranked_list = np.empty((len(range(start, stop, step)), n_cols),
+                                       dtype=dtype)
+            tokens = line.split(None, n_cols)[:n_cols]
+            ranked_list[filled] = tokens if lookup is None else list(map(lookup, tokens))
+            filled += 1
+
+    if ranked_list is None:
+        return np.empty((0, 0), dtype=dtype)
+    return ranked_list[:filled]
+
+
+def _split_string_rows(lines, top_k):
+    # bounded split: the tokens beyond top_k are never split
+    if top_k != -1:
+        return [line.strip().split(" ", top_k)[:top_k] for line in lines]
+    return [line.strip().split(" ") for line in lines]
+
+
+def read_ranked_lists_file_string(file_path, top_k=-1, rows=None):
     """
     Read a numeric ranked list and return it.
 
     Parameters:
         file_path (str): Path to the numeric ranked list file.
         top_k (int): Ranked list size (default is -1, meaning the entire list).
+        rows (slice, range or index array): Rows (queries) to read
+                       (default is None, all rows).
 
     Returns:
         list: A ranked list with image numbers.
     """
     print("\n\tReading file...", file_path)
-    
-    with open(file_path, "r") as f:
-        ranked_list = [line.strip().split(" ") for line in f]
 
-    for i, elements in enumerate(ranked_list):
-        #ranked_list[i] = [int(y) for y in elements]
-        if top_k != -1:
-            ranked_list[i] = ranked_list[i][:top_k]
+    if rows is None:
+        with compression.open_file(file_path, "r") as f:
+            ranked_list = _split_string_rows(f, top_k)
+    else:
+        selection = _resolve_rows(rows, count_lines(file_path))
+        if not isinstance(selection, np.ndarray):
+            selection = range(*selection)
+        ranked_list = _split_string_rows(read_lines_at(file_path, selection), top_k)
+
+    if not ranked_list:
+        return ranked_list
 
     if top_k != -1:
         print("\n\t** Returned ranked list size (limited to top_k):", len(ranked_list[0]))
@@ -160,6 +489,42 @@ def read_ranked_lists_file_string(file_path, top_k=-1):
     return ranked_list
 
 
+def read_ranked_lists_encoded(file_path, lists_path, top_k=-1, dtype=None,
+                              rows=None):
+    """
+    Read a string ranked list into a 2-D integer array of image ids.
+    The name -> id vocabulary is built once from the lists file
+    (see classIndex.get_vocabulary), and can convert ids back to names
+    with Vocabulary.decode. Rows are encoded one at a time into a
+    preallocated array, so the text is never held in memory.
+
+    Parameters:
+        file_path (str): Path to the string ranked list file.
+        lists_path (str): Path to the lists file.
+        top_k (int): Ranked list size (default is -1, meaning the entire list).
+        dtype: Output dtype (default is None, chosen from the dataset size).
+        rows (slice, range or index array): Rows (queries) to read
+                       (default is None, all rows).
+
+    Returns:
+        numpy.ndarray: Array of shape (n_selected_rows, top_k) with image ids.
+    """
+    print("\n\tReading file...", file_path)
+
+    if dtype is None:
+        dtype = get_rk_dtype(len(classIndex.get_vocabulary(lists_path)))
+    ranked_list = _read_rk_rows_serial(file_path, top_k, dtype, rows,
+                                       lists_path=lists_path)
+    n_cols = ranked_list.shape[1]
+
+    if top_k != -1:
+        print("\n\t** Returned ranked list size (limited to top_k):", n_cols)
+    else:
+        print("\n\t** Returned all the ranked list with size:", n_cols)
+
+    return ranked_list
+
+
 def read_matrix_file(file_path):
     """
     Read matrix file and return it
@@ -171,40 +536,445 @@ def read_matrix_file(file_path):
         returns a matrix
     """
     print("\n\tReading file", file_path)
-    with open(file_path, "r") as f:
+    with compression.open_file(file_path, "r") as f:
         return [[float(y) for y in x.strip().split(" ")]
                 for x in f.readlines()]
 
 
+def _iter_row_blocks(file_path, n_cols, chunk_rows, dtype):
+    """
+    Yield arrays of at most chunk_rows parsed rows, each with n_cols columns
+    (n_cols = -1 means the width of the first row).
+    """
+    block = None
+    filled = 0
+    with compression.open_file(file_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if block is None:
+                if n_cols == -1:
+                    n_cols = len(line.split())
+                else:
+                    n_cols = len(line.split(None, n_cols)[:n_cols])
+                block = np.empty((chunk_rows, n_cols), dtype=dtype)
+
+            block[filled] = line.split(None, n_cols)[:n_cols]
+            filled += 1
+            if filled == chunk_rows:
+                yield block
+                block = np.empty((chunk_rows, n_cols), dtype=dtype)
+                filled = 0
+
+    if block is not None and filled > 0:
+        yield block[:filled]
+
+
+def iter_ranked_lists(file_path, top_k=-1, chunk_rows=1024, dtype=np.int32):
+    """
+    Stream a numeric ranked list file in blocks of rows.
+    Memory use is bounded by chunk_rows * top_k, whatever the file size.
+
+    Parameters:
+        file_path (str): Path to the numeric ranked list file.
+        top_k (int): Ranked list size (default is -1, meaning the entire list).
+        chunk_rows (int): Maximum number of rows per block.
+        dtype: Output dtype (default is int32).
+
+    Yields:
+        numpy.ndarray: Blocks of shape (<= chunk_rows, top_k).
+    """
+    return _iter_row_blocks(file_path, top_k, chunk_rows, dtype)
+
+
+def iter_matrix_rows(file_path, chunk_rows=1024, dtype=np.float32):
+    """
+    Stream a matrix file in blocks of rows.
+    Memory use is bounded by chunk_rows * n_cols, whatever the file size.
+
+    Parameters:
+        file_path (str): Path to the matrix file.
+        chunk_rows (int): Maximum number of rows per block.
+        dtype: Output dtype (default is float32).
+
+    Yields:
+        numpy.ndarray: Blocks of shape (<= chunk_rows, n_cols).
+    """
+    with compression.open_file(file_path, "r") as f:
+        while True:
+            block = _load_block(f, chunk_rows, dtype)
+            if block.shape[0] == 0:
+                return
+            yield block
+
+
+def _load_block(f, max_rows, dtype):
+    """
+    Parse up to max_rows lines of an open text file in bulk.
+    """
+    with warnings.catch_warnings():
+        # loadtxt warns when the file is exhausted, which is expected here
+        warnings.simplefilter("ignore", UserWarning)
+        return np.loadtxt(f, dtype=dtype, max_rows=max_rows, ndmin=2,
+                          comments=None)
+
+
+def count_lines(file_path, buffer_size=1 << 20):
+    """
+    Count the lines of a text file without decoding it.
+
+    Parameters:
+        file_path (str): Path to the file.
+        buffer_size (int): Size of the raw read buffer.
+
+    Returns:
+        int: Number of lines (a last line without newline is counted).
+    """
+    n_lines = 0
+    last = b"\n"
+    with compression.open_file(file_path, "rb") as f:
+        while True:
+            buffer = f.read(buffer_size)
+            if not buffer:
+                break
+            n_lines += buffer.count(b"\n")
+            last = buffer[-1:]
+    if last != b"\n":
+        n_lines += 1
+    return n_lines
+
+
+def build_line_index(file_path, buffer_size=1 << 20):
+    """
+    Compute the byte offset of the start of every line of a plain text file.
+
+    Parameters:
+        file_path (str): Path to the file.
+        buffer_size (int): Size of the raw read buffer.
+
+    Returns:
+        numpy.ndarray: int64 array of n_lines + 1 offsets; line i spans
+                       offsets[i]:offsets[i + 1].
+    """
+    parts = [np.zeros(1, dtype=np.int64)]
+    position = 0
+    with open(file_path, "rb") as f:
+        while True:
+            buffer = f.read(buffer_size)
+            if not buffer:
+                break
+            newlines = np.flatnonzero(np.frombuffer(buffer, dtype=np.uint8) == 10)
+            parts.append(newlines.astype(np.int64) + position + 1)
+            position += len(buffer)
+
+    offsets = np.concatenate(parts)
+    if offsets[-1] != position:
+        # last line without newline
+        offsets = np.append(offsets, position)
+    return offsets
+
+
+def get_line_index(file_path):
+    """
+    Return the line-offset index of a file, persisted next to it
+    (file_path + ".idx.npy") and rebuilt only when the file changes.
+
+    Parameters:
+        file_path (str): Path to the plain text file.
+
+    Returns:
+        numpy.ndarray: Offsets as returned by build_line_index.
+    """
+    index_path = file_path + ".idx.npy"
+    size = os.path.getsize(file_path)
+    if (os.path.isfile(index_path)
+            and os.path.getmtime(index_path) >= os.path.getmtime(file_path)):
+        offsets = np.load(index_path, mmap_mode="r")
+        if len(offsets) > 0 and offsets[-1] == size:
+            return offsets
+
+    offsets = build_line_index(file_path)
+    try:
+        with open(index_path, "wb") as f:
+            np.save(f, offsets)
+    except OSError:
+        pass  # read-only location, keep the index in memory only
+    return offsets
+
+
+def read_lines_at(file_path, indices):
+    """
+    Read selected lines of a file, seeking directly to each one.
+    Compressed files cannot seek and are scanned sequentially instead.
+
+    Parameters:
+        file_path (str): Path to the file.
+        indices (iterable of int): Line numbers to read. Negative numbers
+                       count from the end, as in list indexing; numbers
+                       out of range raise IndexError.
+
+    Returns:
+        list: The requested lines (str), in the order of indices.
+    """
+    indices = [int(i) for i in indices]
+
+    if compression.is_compressed(file_path):
+        if any(i < 0 for i in indices):
+            n_lines = count_lines(file_path)
+            indices = [i + n_lines if i < 0 else i for i in indices]
+        wanted = set(indices)
+        found = dict()
+        n_lines = 0
+        with compression.open_file(file_path, "r") as f:
+            for n_lines, line in enumerate(f, 1):
+                if n_lines - 1 in wanted:
+                    found[n_lines - 1] = line
+                    if len(found) == len(wanted):
+                        break
+        for i in indices:
+            if i not in found:
+                raise IndexError("line {} out of range ({} lines)".format(i, n_lines))
+        return [found[i] for i in indices]
+
+    offsets = get_line_index(file_path)
+    n_lines = len(offsets) - 1
+    lines = []
+    with open(file_path, "rb") as f:
+        for i in indices:
+            if i < 0:
+                i += n_lines
+            if not 0 <= i < n_lines:
+                raise IndexError("line {} out of range ({} lines)".format(i, n_lines))
+            f.seek(int(offsets[i]))
+            lines.append(f.read(int(offsets[i + 1] - offsets[i])).decode())
+    return lines
+
+
+def read_ranked_lists_rows(file_path, indices, top_k=-1, dtype=np.int32,
+                           lists_path=None):
+    """
+    Read selected rows of a ranked list file by random access.
+
+    Parameters:
+        file_path (str): Path to the ranked list file.
+        indices (iterable of int): Rows (queries) to read.
+        top_k (int): Ranked list size (default is -1, meaning the entire list).
+        dtype: Output dtype (default is int32).
+        lists_path (str): Lists file, used to encode string ranked lists.
+
+    Returns:
+        numpy.ndarray: Array of shape (len(indices), top_k).
+    """
+    lines = read_lines_at(file_path, indices)
+    if not lines:
+        return np.empty((0, 0), dtype=dtype)
+
+    lookup = None
+    if lists_path is not None:
+        lookup = classIndex.get_vocabulary(lists_path).name_to_id.__getitem__
+
+    n_cols = len(lines[0].split()) if top_k == -1 else top_k
+    n_cols = len(lines[0].split(None, n_cols)[:n_cols])
+    ranked_list = np.empty((len(lines), n_cols), dtype=dtype)
+    for i, line in enumerate(lines):
+        tokens = line.split(None, n_cols)[:n_cols]
+        try:
+            ranked_list[i] = tokens
+        except ValueError:
+            if lookup is None:
+                raise
+            ranked_list[i] = list(map(lookup, tokens))
+    return ranked_list
+
+
+def read_matrix_numpy(file_path, dtype=np.float32, rows=None, chunk_rows=1024,
+                      workers=1):
+    """
+    Read a matrix file into a preallocated ndarray.
+    Rows are parsed in bulk blocks of chunk_rows lines, so no per-element
+    Python float is ever created.
+
+    Parameters:
+        file_path (str): Path to the matrix file.
+        dtype: Output dtype (default is float32).
+        rows (slice, range or index array): Rows to load (default is None,
+                       all rows). Index arrays are read by random access
+                       through the line-offset index.
+        chunk_rows (int): Number of rows parsed per block.
+        workers (int): Number of parsing processes (default is 1, serial;
+                       None uses all CPUs). Only used when reading all rows
+                       of a plain (uncompressed) file.
+
+    Returns:
+        numpy.ndarray: Matrix of shape (n_selected_rows, n_cols).
+    """
+    print("\n\tReading file", file_path)
+
+    if (rows is None and (workers is None or workers > 1)
+            and not compression.is_compressed(file_path)):
+        return _parallel_parse(file_path, "matrix", -1, dtype, workers)
+
+    n_rows = count_lines(file_path)
+    selection = _resolve_rows(rows, n_rows)
+    if isinstance(selection, np.ndarray):
+        if len(selection) == 0:
+            return np.empty((0, 0), dtype=dtype)
+        lines = read_lines_at(file_path, selection)
+        return np.loadtxt(lines, dtype=dtype, ndmin=2, comments=None)
+
+    start, stop, step = selection
+    n_selected = len(range(start, stop, step))
+
+    matrix = None
+    filled = 0
+    with compression.open_file(file_path, "r") as f:
+        for _ in range(start):
+            f.readline()
+
+        position = start
+        while position < stop:
+            block = _load_block(f, min(chunk_rows, stop - position), dtype)
+            if block.shape[0] == 0:
+                break
+            if matrix is None:
+                matrix = np.empty((n_selected, block.shape[1]), dtype=dtype)
+
+            # first row of this block that belongs to the selection
+            first = (start - position) % step
+            selected = block[first::step]
+            matrix[filled:filled + selected.shape[0]] = selected
+            filled += selected.shape[0]
+            position += block.shape[0]
+
+    if matrix is None:
+        return np.empty((0, 0), dtype=dtype)
+    return matrix[:filled]
+
+
+def _split_byte_ranges(file_path, n_ranges):
+    """
+    Split a file into at most n_ranges newline-aligned (begin, end) byte ranges.
+    """
+    size = os.path.getsize(file_path)
+    bounds = [0]
+    with open(file_path, "rb") as f:
+        for i in range(1, n_ranges):
+            target = max(size * i // n_ranges, bounds[-1])
+            f.seek(target)
+            if target > 0:
+                f.readline()  # move to the start of the next line
+            position = min(f.tell(), size)
+            if position > bounds[-1]:
+                bounds.append(position)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+def _read_byte_range(file_path, byte_range):
+    begin, end = byte_range
+    with open(file_path, "rb") as f:
+        f.seek(begin)
+        return f.read(end - begin)
+
+
+def _count_range_rows(file_path, byte_range):
+    data = _read_byte_range(file_path, byte_range)
+    return sum(1 for line in data.splitlines() if line.strip())
+
+
+def _parse_range(file_path, byte_range, kind, n_cols, dtype,
+                 out_path, shape, row_offset):
+    """
+    Parse one byte range and write its rows into the shared output file.
+    """
+    lines = [line for line in
+             _read_byte_range(file_path, byte_range).decode().splitlines()
+             if line.strip()]
+    if not lines:
+        return 0
+
+    if kind == "matrix":
+        block = np.loadtxt(lines, dtype=dtype, ndmin=2, comments=None)
+    else:
+        block = np.empty((len(lines), n_cols), dtype=dtype)
+        for i, line in enumerate(lines):
+            block[i] = line.split(None, n_cols)[:n_cols]
+
+    out = np.memmap(out_path, dtype=dtype, mode="r+", shape=shape)
+    out[row_offset:row_offset + block.shape[0]] = block
+    out.flush()
+    del out
+    return block.shape[0]
+
+
+def _parallel_parse(file_path, kind, top_k, dtype, workers):
+    """
+    Parse a ranked list ("rk") or matrix ("matrix") file with a process pool.
+    The file is split into newline-aligned byte ranges, each range is parsed
+    by a worker, and the rows are gathered into one preallocated array
+    shared by all workers (memory-mapped from the scratch space, see scratch).
+    The result is identical to a serial parse.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    size = os.path.getsize(file_path)
+    n_ranges = max(workers, -(-size // PARALLEL_RANGE_BYTES))
+    ranges = _split_byte_ranges(file_path, n_ranges)
+
+    # the width comes from the first row, as in the serial readers
+    n_cols = 0
+    with open(file_path, "r") as f:
+        for line in f:
+            if line.strip():
+                n_cols = len(line.split())
+                break
+    if kind == "rk" and top_k != -1:
+        n_cols = min(n_cols, top_k)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        counts = list(executor.map(_count_range_rows,
+                                   [file_path] * len(ranges), ranges))
+        n_rows = sum(counts)
+        dtype = np.dtype(dtype)
+        shape = (n_rows, n_cols)
+
+        if n_rows == 0 or n_cols == 0:
+            return np.empty(shape, dtype=dtype)
+
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1])).tolist()
+
+        n_bytes = n_rows * n_cols * dtype.itemsize
+        shared_dir = scratch.ScratchDir(prefix="pyudlf_parse_", expected_bytes=n_bytes)
+        out_path = shared_dir.join("parse.bin")
+        try:
+            with open(out_path, "wb") as f:
+                f.truncate(n_bytes)
+            futures = [executor.submit(_parse_range, file_path, byte_range,
+                                       kind, n_cols, dtype, out_path, shape,
+                                       offset)
+                       for byte_range, offset in zip(ranges, offsets)]
+            for future in futures:
+                future.result()
+            result = np.fromfile(out_path, dtype=dtype).reshape(shape)
+        finally:
+            shared_dir.cleanup()
+
+    return result
+
+
 def read_classes(lists_path="", classes_path="", input_type=None):
     '''
     Dado o arquivo de listas e de classes no padrão do UDLF, retorna uma lista
     com a classe de cada elemento na ordem.
 
     se input foi dado, pegara dele, se nao, dos paths fornecidos
+
+    Os arquivos sao lidos uma unica vez (ver classIndex.get_class_index).
     '''
     if input_type is not None:
         classes_path = str(input_type.get_classes_file()[0].strip())
         lists_path = str(input_type.get_lists_file()[0].strip())
 
-    # lê o lists
-    f = open(lists_path)
-    lists = [x.strip() for x in f.readlines()]
-    f.close()
-
-    # lê as classes em um dicionário
-    f = open(classes_path)
-    content = [x.strip() for x in f.readlines()]
-    classes_dict = dict()
-    for line in content:
-        key = line.split(':')[0]
-        value = int(line.split(':')[-1])
-        classes_dict[key] = value
-    f.close()
-
-    # calcula uma lista com a classe de cada elemento na ordem
-    classes_list = []
-    for element in lists:
-        classes_list.append(classes_dict[element])
-
-    return classes_list
+    return classIndex.get_class_index(lists_path, classes_path).get_classes_list()
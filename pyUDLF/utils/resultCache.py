@@ -0,0 +1,240 @@
+"""
+Content-addressed cache of UDLF runs.
+
+A run is identified by a hash of its normalized config parameters (output
+paths excluded), the identity of the binary, and the digests of its input,
+lists and classes files. File digests are memoized by (path, mtime, size),
+so unchanged inputs are hashed only once per process.
+
+Each entry is a directory named after the key, holding the output file, the
+binary's log file (if any) and the parsed log. The cache is bounded in size;
+the least recently used entries are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import logging
+from pathlib import Path
+from pyUDLF.utils import readData
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = str(Path.home() / ".pyudlf" / "cache")
+CACHE_MAX_BYTES = 2 << 30
+
+# parameters ignored by the key: where the results are written
+IGNORED_PARAMS = ("OUTPUT_FILE_PATH", "OUTPUT_LOG_FILE_PATH")
+INPUT_PARAMS = ("INPUT_FILE", "INPUT_FILE_LIST", "INPUT_FILE_CLASSES")
+
+_digests = dict()
+_digests_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+
+def set_cache_dir(path: str) -> None:
+    """
+    Set the directory where cache entries are stored.
+    """
+    global CACHE_DIR
+    CACHE_DIR = str(path)
+
+
+def set_max_bytes(max_bytes: int) -> None:
+    """
+    Set the maximum total size of the cache, in bytes.
+    """
+    global CACHE_MAX_BYTES
+    CACHE_MAX_BYTES = int(max_bytes)
+
+
+def file_digest(path: str) -> str:
+    """
+    SHA-256 of a file, memoized by (path, mtime, size).
+
+    Args:
+        path (str): File path.
+
+    Returns:
+        str: Hex digest.
+    """
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _digests_lock:
+        cached = _digests.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+
+    with _digests_lock:
+        _digests[key] = (stamp, digest)
+    return digest
+
+
+def _is_input_param(param: str) -> bool:
+    return param in INPUT_PARAMS or param.startswith("INPUT_FILES_FUSION_")
+
+
+def get_key(config_file: str, bin_path: str) -> str:
+    """
+    Compute the cache key of a run.
+
+    Args:
+        config_file (str): Path to the configuration file.
+        bin_path (str): Path to the UDLF binary.
+
+    Returns:
+        str: Hex key.
+    """
+    config = readData.load_config(config_file)
+    normalized = dict()
+    for param in config.list_parameters:
+        if param in IGNORED_PARAMS:
+            continue
+        value = config.get(param)
+        if _is_input_param(param) and os.path.isfile(value):
+            value = "sha256:" + file_digest(value)
+        normalized[param] = value
+
+    identity = {
+        "params": normalized,
+        "binary": file_digest(bin_path) if os.path.isfile(bin_path) else bin_path,
+    }
+    text = json.dumps(identity, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _output_paths(config_file: str):
+    config = readData.load_config(config_file)
+    output_path = ""
+    if config.get("OUTPUT_FILE").upper() == "TRUE" and config.get("OUTPUT_FILE_PATH"):
+        output_path = config.get("OUTPUT_FILE_PATH") + ".txt"
+    log_path = ""
+    if config.get("OUTPUT_LOG_FILE").upper() == "TRUE":
+        log_path = config.get("OUTPUT_LOG_FILE_PATH")
+    return output_path, log_path
+
+
+def _entry_dir(key: str) -> str:
+    return os.path.join(CACHE_DIR, key)
+
+
+def _entry_size(entry: str) -> int:
+    return sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+
+
+def lookup(key: str, config_file: str):
+    """
+    Restore a cached run: copy its output and log files to the paths of
+    config_file and return the parsed log.
+
+    Args:
+        key (str): Cache key (see get_key).
+        config_file (str): Configuration file of the new run.
+
+    Returns:
+        dict or None: Parsed log, or None on a cache miss.
+    """
+    entry = _entry_dir(key)
+    log_json = os.path.join(entry, "log.json")
+    with _cache_lock:
+        if not os.path.isfile(log_json):
+            return None
+        try:
+            with open(log_json, "r") as f:
+                log_dict = json.load(f)
+            output_path, log_path = _output_paths(config_file)
+            for name, path in (("output.txt", output_path), ("log.txt", log_path)):
+                cached = os.path.join(entry, name)
+                if path and os.path.isfile(cached):
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                    shutil.copyfile(cached, path)
+            # the entry mtime is its last use, for LRU eviction
+            os.utime(entry)
+        except Exception as e:
+            logger.warning(f"Could not restore cache entry {key}: {e}")
+            return None
+
+    logger.info(f"Result cache hit: {key}")
+    return log_dict
+
+
+def store(key: str, config_file: str, log_dict: dict) -> None:
+    """
+    Store the results of a finished run, then evict old entries if the
+    cache is over CACHE_MAX_BYTES.
+
+    Args:
+        key (str): Cache key (see get_key).
+        config_file (str): Configuration file that was run.
+        log_dict (dict): Parsed log of the run.
+    """
+    entry = _entry_dir(key)
+    tmp_entry = entry + ".tmp"
+    output_path, log_path = _output_paths(config_file)
+
+    with _cache_lock:
+        try:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            os.makedirs(tmp_entry)
+            for name, path in (("output.txt", output_path), ("log.txt", log_path)):
+                if path and os.path.isfile(path):
+                    shutil.copyfile(path, os.path.join(tmp_entry, name))
+            with open(os.path.join(tmp_entry, "log.json"), "w") as f:
+                json.dump(log_dict, f)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_entry, entry)
+        except Exception as e:
+            logger.warning(f"Could not store cache entry {key}: {e}")
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            return
+        _evict()
+
+
+def _evict() -> None:
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        entry = os.path.join(CACHE_DIR, name)
+        if os.path.isdir(entry) and not name.endswith(".tmp"):
+            entries.append((os.path.getmtime(entry), _entry_size(entry), entry))
+
+    total = sum(size for _, size, _ in entries)
+    # the most recent entry (the one just stored) is always kept
+    for _, size, entry in sorted(entries)[:-1]:
+        if total <= CACHE_MAX_BYTES:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        logger.debug(f"Evicted cache entry {entry}")
+
+
+def invalidate(key: str = None) -> None:
+    """
+    Remove one cache entry, or the whole cache if key is None.
+
+    Args:
+        key (str, optional): Cache key (see get_key).
+    """
+    with _cache_lock:
+        if key is None:
+            shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        else:
+            shutil.rmtree(_entry_dir(key), ignore_errors=True)
+    with _digests_lock:
+        if key is None:
+            _digests.clear()
+
+
+def invalidate_config(config_file: str, bin_path: str) -> None:
+    """
+    Remove the cache entry of a (config, binary) pair.
+    """
+    invalidate(get_key(config_file, bin_path))
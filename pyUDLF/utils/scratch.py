@@ -0,0 +1,154 @@
+"""
+Scratch space for temporary configs, logs and generated inputs.
+
+Per-run artifacts are written to a private subdirectory of a memory-backed
+root (/dev/shm, or a tmpfs given with set_scratch_root) instead of the
+default temp dir, which may be on a slow network mount. When the files
+written to memory would exceed the memory budget, new scratch directories
+fall back to disk (tempfile.gettempdir()).
+
+Scratch directories are removed when closed, when their owner is garbage
+collected, or at interpreter exit, whichever comes first.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+import logging
+
+logger = logging.getLogger(__name__)
+
+# None -> /dev/shm when available
+SCRATCH_ROOT = None
+SCRATCH_MAX_BYTES = 1 << 30
+
+_live = set()
+_live_lock = threading.Lock()
+
+
+def set_scratch_root(path: str = None) -> None:
+    """
+    Set the memory-backed directory used for scratch space
+    (None to use /dev/shm when available).
+    """
+    global SCRATCH_ROOT
+    SCRATCH_ROOT = path
+
+
+def set_memory_budget(max_bytes: int) -> None:
+    """
+    Set the maximum number of bytes kept in memory-backed scratch space.
+    """
+    global SCRATCH_MAX_BYTES
+    SCRATCH_MAX_BYTES = int(max_bytes)
+
+
+def _memory_root():
+    for root in (SCRATCH_ROOT, "/dev/shm"):
+        if root and os.path.isdir(root) and os.access(root, os.W_OK):
+            return root
+    return None
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def memory_usage() -> int:
+    """
+    Bytes currently held by live scratch directories in memory.
+    """
+    root = _memory_root()
+    if root is None:
+        return 0
+    with _live_lock:
+        paths = [path for path in _live if path.startswith(root + os.sep)]
+    return sum(_dir_size(path) for path in paths)
+
+
+def get_scratch_root(expected_bytes: int = 0) -> str:
+    """
+    Choose where a new scratch directory goes: the memory-backed root if
+    expected_bytes fits in the budget (and in its free space), disk otherwise.
+
+    Args:
+        expected_bytes (int): Estimated size of the files to be written.
+
+    Returns:
+        str: Root directory.
+    """
+    root = _memory_root()
+    if root is not None:
+        try:
+            free = shutil.disk_usage(root).free
+        except OSError:
+            free = 0
+        if (memory_usage() + expected_bytes <= SCRATCH_MAX_BYTES
+                and expected_bytes < free):
+            return root
+        logger.debug(f"Scratch budget exceeded, falling back to disk for {expected_bytes} bytes")
+    return tempfile.gettempdir()
+
+
+def _remove(path: str) -> None:
+    shutil.rmtree(path, ignore_errors=True)
+    with _live_lock:
+        _live.discard(path)
+
+
+class ScratchDir:
+    """
+    Private scratch directory, usable as a context manager.
+
+    Attributes:
+        path -> directory path
+    """
+
+    def __init__(self, prefix="pyudlf_", expected_bytes=0):
+        """
+        Create the directory (see get_scratch_root).
+        """
+        self.path = tempfile.mkdtemp(prefix=prefix, dir=get_scratch_root(expected_bytes))
+        with _live_lock:
+            _live.add(self.path)
+        # removes the directory on cleanup(), garbage collection or exit
+        self._finalizer = weakref.finalize(self, _remove, self.path)
+
+    def join(self, *names):
+        return os.path.join(self.path, *names)
+
+    def cleanup(self):
+        """
+        Remove the directory and everything in it.
+        """
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+
+def mkstemp(suffix="", prefix="pyudlf_", dir=None):
+    """
+    Create a single temporary file, as tempfile.mkstemp, in dir (e.g. the
+    path of a ScratchDir) or in the scratch root (the caller removes it).
+
+    Returns:
+        str: File path.
+    """
+    if dir is None:
+        dir = get_scratch_root()
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix=prefix, dir=dir)
+    os.close(fd)
+    return path
@@ -0,0 +1,204 @@
+"""
+Paired significance tests for before/after effectiveness.
+
+All functions take the per-query values of a measure before and after
+re-ranking (for example the lists returned by evaluation.compute_map, or the
+"per_query" arrays of evaluation.evaluate) and work on the paired
+differences. Resampling is done as matrix products over blocks of
+chunk_size resamples, so memory is bounded by chunk_size * n_queries, and
+every test uses a fixed seed so results are reproducible.
+"""
+
+import math
+import numpy as np
+
+
+def _differences(before, after):
+    before = np.asarray(before, dtype=np.float64)
+    after = np.asarray(after, dtype=np.float64)
+    if before.shape != after.shape or before.ndim != 1:
+        raise ValueError("before and after must be 1-D and have the same length.")
+    if len(before) == 0:
+        raise ValueError("At least one query is needed.")
+    return after - before
+
+
+def _chunks(total, chunk_size):
+    for start in range(0, total, chunk_size):
+        yield min(chunk_size, total - start)
+
+
+def paired_bootstrap(before, after, n_resamples=10000, confidence=0.95, seed=0, chunk_size=1000):
+    """
+    Percentile bootstrap confidence interval of the mean gain.
+    Each resample draws queries with replacement, expressed as a row of
+    multinomial counts, so a block of resamples is one counts @ gains product.
+
+    Parameters:
+        before (array): Per-query values before re-ranking.
+        after (array): Per-query values after re-ranking.
+        n_resamples (int): Number of bootstrap resamples.
+        confidence (float): Confidence level of the interval.
+        seed (int): Random seed.
+        chunk_size (int): Resamples drawn per block.
+
+    Returns:
+        dict: {"mean_gain", "ci_low", "ci_high", "p_value"}, where p_value is
+              the two-sided bootstrap probability of a gain of the other sign.
+    """
+    diff = _differences(before, after)
+    n = len(diff)
+    rng = np.random.default_rng(seed)
+    probabilities = np.full(n, 1.0 / n)
+
+    means = np.empty(n_resamples)
+    pos = 0
+    for size in _chunks(n_resamples, chunk_size):
+        counts = rng.multinomial(n, probabilities, size=size)
+        means[pos:pos + size] = counts @ diff / n
+        pos += size
+
+    alpha = 1.0 - confidence
+    low, high = np.quantile(means, [alpha / 2, 1 - alpha / 2])
+    p_value = min(1.0, 2 * min(np.mean(means <= 0), np.mean(means >= 0)))
+    return {
+        "mean_gain": float(diff.mean()),
+        "ci_low": float(low),
+        "ci_high": float(high),
+        "p_value": float(p_value),
+    }
+
+
+def permutation_test(before, after, n_permutations=10000, seed=0, chunk_size=1000):
+    """
+    Two-sided paired permutation (sign-flip) test of the mean gain.
+    Under the null hypothesis before and after are exchangeable for each
+    query, so each permutation flips the sign of a random subset of gains.
+
+    Parameters:
+        before (array): Per-query values before re-ranking.
+        after (array): Per-query values after re-ranking.
+        n_permutations (int): Number of random sign flips.
+        seed (int): Random seed.
+        chunk_size (int): Permutations drawn per block.
+
+    Returns:
+        float: p-value.
+    """
+    diff = _differences(before, after)
+    n = len(diff)
+    observed = abs(diff.mean())
+    rng = np.random.default_rng(seed)
+
+    extreme = 0
+    for size in _chunks(n_permutations, chunk_size):
+        signs = rng.integers(0, 2, size=(size, n), dtype=np.int8) * 2 - 1
+        stats = np.abs(signs @ diff) / n
+        # tolerance so that ties with the observed value count as extreme
+        extreme += int(np.count_nonzero(stats >= observed - 1e-12))
+
+    return (extreme + 1) / (n_permutations + 1)
+
+
+def _betacf(a, b, x, max_iter=200, eps=3e-16):
+    # continued fraction of the regularized incomplete beta function
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, max_iter + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < eps:
+            break
+    return h
+
+
+def _incomplete_beta(a, b, x):
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(log_front) * _betacf(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _betacf(b, a, 1.0 - x) / b
+
+
+def paired_t_test(before, after):
+    """
+    Two-sided paired Student's t-test of the mean gain.
+
+    Parameters:
+        before (array): Per-query values before re-ranking.
+        after (array): Per-query values after re-ranking.
+
+    Returns:
+        tuple: (t statistic, p-value)
+    """
+    diff = _differences(before, after)
+    n = len(diff)
+    if n < 2:
+        return 0.0, 1.0
+
+    mean = diff.mean()
+    std = diff.std(ddof=1)
+    if std == 0:
+        return (0.0, 1.0) if mean == 0 else (math.copysign(math.inf, mean), 0.0)
+
+    t = mean / (std / math.sqrt(n))
+    df = n - 1
+    p_value = _incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+    return float(t), float(p_value)
+
+
+def compare(before, after, n_resamples=10000, confidence=0.95, alpha=0.05,
+            seed=0, chunk_size=1000):
+    """
+    Run the bootstrap, the permutation test and the t-test on a before/after
+    pair and return a compact summary.
+
+    Parameters:
+        before (array): Per-query values before re-ranking.
+        after (array): Per-query values after re-ranking.
+        n_resamples (int): Resamples of the bootstrap and the permutation test.
+        confidence (float): Confidence level of the bootstrap interval.
+        alpha (float): Significance level.
+        seed (int): Random seed.
+        chunk_size (int): Resamples drawn per block.
+
+    Returns:
+        dict: {"n", "mean_before", "mean_after", "mean_gain", "ci_low",
+               "ci_high", "p_permutation", "p_ttest", "significant"}.
+              significant is True when both tests reject at alpha.
+    """
+    bootstrap = paired_bootstrap(before, after, n_resamples, confidence, seed, chunk_size)
+    p_permutation = permutation_test(before, after, n_resamples, seed, chunk_size)
+    _, p_ttest = paired_t_test(before, after)
+
+    return {
+        "n": len(before),
+        "mean_before": float(np.mean(before)),
+        "mean_after": float(np.mean(after)),
+        "mean_gain": bootstrap["mean_gain"],
+        "ci_low": bootstrap["ci_low"],
+        "ci_high": bootstrap["ci_high"],
+        "p_permutation": p_permutation,
+        "p_ttest": p_ttest,
+        "significant": bool(p_permutation < alpha and p_ttest < alpha),
+    }
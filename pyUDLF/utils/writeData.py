@@ -1,9 +1,50 @@
+import numpy as np
+from pyUDLF.utils import compression, binaryData
 
-def write_data(mtx, path):
-    f = open(path, "w+")
-    for i in range(len(mtx)):
-        for y in range(len(mtx[i])):
-            f.write("{} ".format(str(mtx[i][y])))
-        f.write("\n")
+# size of the write buffer used by write_data
+WRITE_BUFFER_SIZE = 1 << 20
 
-    f.close()
+
+def _format_rows(rows, precision=None):
+    """
+    Format a block of rows in the UDLF text layout ("v1 v2 ... vn \n").
+    """
+    if isinstance(rows, np.ndarray):
+        if np.issubdtype(rows.dtype, np.floating):
+            if precision is None:
+                # numpy's shortest repr, same text as str() of each element
+                rows = rows.astype(str)
+            else:
+                fmt = " ".join(["%.{}f".format(precision)] * rows.shape[1]) + " \n"
+                return "".join(fmt % tuple(row) for row in rows.tolist())
+        rows = rows.tolist()
+
+    if precision is not None:
+        return "".join(
+            "".join("{:.{}f} ".format(float(y), precision) for y in row) + "\n"
+            for row in rows)
+    return "".join(" ".join(map(str, row)) + " \n" if len(row) else "\n"
+                   for row in rows)
+
+
+def write_data(mtx, path, precision=None, binary=False, chunk_rows=1024):
+    """
+    Write a ranked list or matrix in the UDLF text format.
+    Rows are formatted in blocks and written through a large buffer.
+
+    Parameters:
+        mtx -> list of lists or 2-D ndarray
+        path -> output path (compressed if it ends in .gz, .bz2, .xz, ...)
+        precision -> number of decimals for floats (default None, str() of each value)
+        binary -> if True, also write a binary sidecar (path + ".bin")
+        chunk_rows -> number of rows formatted per block
+    """
+    if isinstance(mtx, np.ndarray) and mtx.ndim != 2:
+        raise ValueError("write_data expects 2-D data.")
+
+    with compression.open_file(path, "w", buffering=WRITE_BUFFER_SIZE) as f:
+        for start in range(0, len(mtx), chunk_rows):
+            f.write(_format_rows(mtx[start:start + chunk_rows], precision))
+
+    if binary:
+        binaryData.write_binary(mtx, str(path) + ".bin")
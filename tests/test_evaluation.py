@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from pyUDLF.utils import evaluation
+
+
+@pytest.fixture
+def ranked_lists():
+    rng = np.random.default_rng(0)
+    n = 200
+    classes = rng.integers(0, 20, n).tolist()
+    rks = np.argsort(rng.random((n, n)), axis=1)
+    return rks, classes
+
+
+@pytest.mark.parametrize("map_depth", [3, 20])
+def test_evaluate_map_depth_matches_compute(ranked_lists, map_depth):
+    rks, classes = ranked_lists
+    result = evaluation.evaluate(rks, classes, metrics=("MRR", "R-PRECISION", "MAP"),
+                                 depths=(5, 100), map_depth=map_depth)
+
+    _, mrr = evaluation.compute_mrr(rks, classes, map_depth)
+    _, r_precision = evaluation.compute_r_precision(rks, classes, map_depth)
+    _, ap = evaluation.compute_map(rks, classes, map_depth)
+
+    np.testing.assert_allclose(result["per_query"]["MRR"], mrr)
+    np.testing.assert_allclose(result["per_query"]["R-Precision"], r_precision)
+    np.testing.assert_allclose(result["per_query"]["MAP"], ap)
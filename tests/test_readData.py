@@ -0,0 +1,33 @@
+import gzip
+
+import pytest
+
+from pyUDLF.utils import readData
+
+LINES = ["1 2 3 \n", "4 5 6 \n", "7 8 9 \n"]
+
+
+@pytest.fixture(params=["plain", "gz"])
+def lines_file(request, tmp_path):
+    if request.param == "gz":
+        path = tmp_path / "rks.txt.gz"
+        with gzip.open(path, "wt") as f:
+            f.writelines(LINES)
+    else:
+        path = tmp_path / "rks.txt"
+        path.write_text("".join(LINES))
+    return str(path)
+
+
+def test_read_lines_at(lines_file):
+    assert readData.read_lines_at(lines_file, [2, 0]) == [LINES[2], LINES[0]]
+
+
+def test_read_lines_at_negative(lines_file):
+    assert readData.read_lines_at(lines_file, [-1, -3]) == [LINES[2], LINES[0]]
+
+
+@pytest.mark.parametrize("index", [3, -4])
+def test_read_lines_at_out_of_range(lines_file, index):
+    with pytest.raises(IndexError):
+        readData.read_lines_at(lines_file, [0, index])